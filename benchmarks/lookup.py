@@ -0,0 +1,70 @@
+"""
+Context lookup time of the exception driven and the type dispatched
+`Ctx.deep_get` across context stack depths.
+
+Usage: python benchmarks/lookup.py [max_depth]
+"""
+
+import sys
+import timeit
+from typing import Any
+
+from combustache.ctx import MISSING, Ctx
+
+
+def probing_deep_get(item: Any, key: str) -> Any:
+    # the previous implementation, kept for comparison
+    try:
+        item = item()
+    except TypeError:
+        pass
+
+    try:
+        return item[key]
+    except KeyError:
+        return MISSING
+    except TypeError:
+        pass
+
+    try:
+        idx = int(key)
+        return item[idx]
+    except IndexError:
+        return MISSING
+    except ValueError:
+        pass
+
+    return getattr(item, key, MISSING)
+
+
+class ProbingCtx(Ctx):
+    deep_get = staticmethod(probing_deep_get)
+
+
+def time_lookups(ctx_type: type[Ctx], depth: int, key: str) -> float:
+    ctx = ctx_type([{'found': 1}] + [{f'k{i}': i} for i in range(depth)])
+    number = 20000
+    seconds = min(
+        timeit.repeat(lambda: ctx.find_first(key), number=number, repeat=3)
+    )
+    return seconds / number * 1e9
+
+
+def main(max_depth: int = 32) -> None:
+    print(
+        f'{"depth":>6} {"key":>7} {"old ns":>9} {"new ns":>9} {"speedup":>8}'
+    )
+    depth = 1
+    while depth <= max_depth:
+        for key in ('found', 'missing'):
+            old = time_lookups(ProbingCtx, depth, key)
+            new = time_lookups(Ctx, depth, key)
+            print(
+                f'{depth:>6} {key:>7} {old:>9.0f} {new:>9.0f}'
+                f' {old / new:>7.1f}x'
+            )
+        depth *= 2
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
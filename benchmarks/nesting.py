@@ -0,0 +1,38 @@
+"""
+Parse time vs. section nesting depth.
+
+Usage: python benchmarks/nesting.py [max_depth]
+"""
+
+import sys
+import timeit
+
+from combustache import Template
+
+
+def nested_template(depth: int) -> str:
+    opening = ''.join(f'{{{{#s{i}}}}}{{{{v{i}}}}}\n' for i in range(depth))
+    closing = ''.join(f'{{{{/s{i}}}}}\n' for i in reversed(range(depth)))
+    return opening + closing
+
+
+def main(max_depth: int = 1600) -> None:
+    print(f'{"depth":>8} {"parse ms":>10} {"us/level":>10}')
+    depth = 25
+    while depth <= max_depth:
+        template = nested_template(depth)
+        number = max(1, 2000 // depth)
+        seconds = min(
+            timeit.repeat(
+                lambda template=template: Template(template),
+                number=number,
+                repeat=3,
+            )
+        )
+        ms = seconds / number * 1000
+        print(f'{depth:>8} {ms:>10.3f} {ms * 1000 / depth:>10.2f}')
+        depth *= 2
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,76 @@
+"""
+Rendering time of many records one by one and with `render_many`
+across worker counts.
+
+Usage: python benchmarks/render_many.py [records] [max_workers]
+"""
+
+import os
+import sys
+import time
+
+import combustache
+
+TEMPLATE = """\
+Dear {{name}},
+{{#items}}
+  {{>line}}
+{{/items}}
+Total: {{total}}
+"""
+PARTIALS = {'line': '{{title}} x{{count}} = {{price}}'}
+
+
+def make_records(n: int) -> list[dict]:
+    return [
+        {
+            'name': f'Customer {i}',
+            'items': [
+                {'title': f'Item {j}', 'count': j, 'price': j * 2.5}
+                for j in range(20)
+            ],
+            'total': i * 10,
+        }
+        for i in range(n)
+    ]
+
+
+def time_it(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main(n: int = 20000, max_workers: int = os.cpu_count() or 1) -> None:
+    records = make_records(n)
+    template = combustache.Template(TEMPLATE)
+    partials = combustache.Partials(PARTIALS)
+
+    sequential = time_it(
+        lambda: [template.render(r, partials, compile=True) for r in records]
+    )
+    print(f'{"executor":>8} {"workers":>7} {"seconds":>8} {"speedup":>8}')
+    print(f'{"-":>8} {1:>7} {sequential:>8.2f} {1:>7.1f}x')
+
+    for executor in ('process', 'thread'):
+        workers = 1
+        while workers <= max_workers:
+            results = combustache.render_many(
+                template,
+                records,
+                partials,
+                workers=workers,
+                executor=executor,  # type: ignore
+                chunksize=256,
+                compile=True,
+            )
+            seconds = time_it(list, results)
+            print(
+                f'{executor:>8} {workers:>7} {seconds:>8.2f}'
+                f' {sequential / seconds:>7.1f}x'
+            )
+            workers *= 2
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -5,6 +5,8 @@ Usable both in code and as CLI.
 To render a mustache template use `combustache.render`.
 To load templates/partials from a directory use `combustache.load_templates`.
 To work with template objects directly use `combustache.Template`.
+Parsed templates are cached in `combustache.template_cache`
+and templates returned by lambdas in `combustache.lambda_cache`.
 
 Typical usage in code: ::
 
@@ -22,21 +24,57 @@ Typical usage as CLI: ::
     Hello world!
 """
 
+from .cache import CacheInfo, LRUCache
+from .directory import TemplateDirectory
+from .diskcache import DiskCache
 from .exceptions import (
     CombustacheError,
     DelimiterError,
     MissingClosingTagError,
+    ServerError,
     StrayClosingTagError,
 )
-from .main import Template, render
-from .util import load_templates
+from .jsonstream import stream_json
+from .main import (
+    Template,
+    get_template,
+    lambda_cache,
+    render,
+    template_cache,
+)
+from .parallel import render_many
+from .partials import Partials
+from .profiler import Profiler
+from .util import (
+    SafeString,
+    TemplateLoader,
+    cached_escape_html,
+    escape_html,
+    load_templates,
+)
 
 __all__ = [
     'render',
+    'render_many',
+    'stream_json',
     'Template',
     'CombustacheError',
     'DelimiterError',
     'MissingClosingTagError',
     'StrayClosingTagError',
+    'ServerError',
     'load_templates',
+    'TemplateLoader',
+    'TemplateDirectory',
+    'get_template',
+    'template_cache',
+    'lambda_cache',
+    'LRUCache',
+    'CacheInfo',
+    'DiskCache',
+    'Partials',
+    'Profiler',
+    'SafeString',
+    'escape_html',
+    'cached_escape_html',
 ]
@@ -1,14 +1,29 @@
 import argparse
 import json
+import sys
+from collections import ChainMap
+from itertools import tee
 from pathlib import Path
-from typing import Sequence
+from typing import Any, Iterator, Mapping, Sequence, TextIO
 
 from .__version__ import __version__
-from .main import render
-from .util import find_template_files, paths_to_templates
+from .directory import TemplateDirectory
+from .diskcache import DiskCache
+from .exceptions import ServerError
+from .jsonstream import stream_json
+from .main import get_template
+from .parallel import render_many
+from .partials import Partials
+from .util import TemplateLoader, paths_to_templates
 
 
 def cli(argv: Sequence[str] | None = None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ['serve']:
+        return serve_cli(argv[1:])
+    if argv[:1] == ['client']:
+        return client_cli(argv[1:])
+
     parser = argparse.ArgumentParser(
         prog='combustache',
         description='an explosive mustache v1.4 implementation with all'
@@ -24,7 +39,8 @@ def cli(argv: Sequence[str] | None = None):
 
     parser.add_argument(
         'template',
-        help='mustache template file (use -s for string)',
+        help='mustache template file (use -s for string),'
+        " or 'serve' or 'client' to run or use a render server",
     )
 
     parser.add_argument(
@@ -89,39 +105,266 @@ def cli(argv: Sequence[str] | None = None):
         help="right mustache template delimiter (defaults to '}}')",
     )
 
+    parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        help='directory to cache parsed and compiled templates in,'
+        ' templates are rendered compiled',
+    )
+
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='decode the data lazily and write the output while rendering,'
+        ' for data too big for memory (arrays can only be iterated once)',
+    )
+
+    parser.add_argument(
+        '--jsonl',
+        '--batch',
+        action='store_true',
+        help='render the template once for every line of the data file,'
+        ' every line is a json record',
+    )
+
+    parser.add_argument(
+        '--separator',
+        default='',
+        help='string written between outputs of records (defaults to nothing)',
+    )
+
+    parser.add_argument(
+        '--output-pattern',
+        help='write every record to its own file, the pattern is formatted'
+        " with {index} and {record} (e.g. 'out/{record[id]}.html')",
+    )
+
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=1,
+        help='number of worker processes rendering records (defaults to 1)',
+    )
+
     args = parser.parse_args(argv)
 
+    if args.jobs < 1:
+        parser.error('--jobs has to be positive')
+    if not args.jsonl and (
+        args.separator or args.output_pattern or args.jobs != 1
+    ):
+        parser.error('--separator, --output-pattern and --jobs need --jsonl')
+    if args.stream and args.jsonl:
+        parser.error('--stream and --jsonl can not be used together')
+
     if args.string:
         template = args.template
     else:
         with open(args.template) as f:
             template = f.read()
 
-    data = json.load(args.data)
-
     if args.partial is None:
         args.partial = []
 
-    partials = paths_to_templates(
+    partials: Mapping[str, str] = paths_to_templates(
         args.partial, args.partial_ext, False, Path('.')
     )
 
     if args.partial_dir:
-        partial_files = find_template_files(args.partial_dir, args.partial_ext)
-        partials_from_dir = paths_to_templates(
-            partial_files,
-            args.partial_ext,
-            args.include_relative_path,
+        # only the partials the template uses are read
+        loader = TemplateLoader(
             args.partial_dir,
+            args.partial_ext,
+            include_relative_path=args.include_relative_path,
         )
-        partials.update(partials_from_dir)
+        partials = ChainMap(loader, partials)  # type: ignore
 
     left_delimiter = args.left_delimiter
     right_delimiter = args.right_delimiter
+    disk_cache = DiskCache(args.cache_dir) if args.cache_dir else None
+
+    if disk_cache is not None:
+        root = disk_cache.get_template(
+            template, left_delimiter, right_delimiter
+        )
+    else:
+        root = get_template(template, left_delimiter, right_delimiter)
+    partials = Partials(partials, disk_cache=disk_cache)
+
+    if args.stream:
+        root.render_to(stream_json(args.data), args.output, partials)
+        return
+
+    if not args.jsonl:
+        output = root.render(
+            json.load(args.data), partials, compile=disk_cache is not None
+        )
+        args.output.write(output)
+        return
+
+    # records are rendered with the template parsed and compiled once
+    records = read_records(args.data)
+    if args.output_pattern:
+        records, pattern_records = tee(records)
+    outputs: Iterator[str]
+    if args.jobs == 1:
+        outputs = (root.render(r, partials, compile=True) for r in records)
+    else:
+        outputs = render_many(
+            root, records, partials, workers=args.jobs, compile=True
+        )
+
+    if args.output_pattern:
+        for index, (record, output) in enumerate(
+            zip(pattern_records, outputs)
+        ):
+            path = Path(args.output_pattern.format(index=index, record=record))
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(output)
+        return
+
+    for index, output in enumerate(outputs):
+        if index:
+            args.output.write(args.separator)
+        args.output.write(output)
+
+
+def serve_cli(argv: Sequence[str]):
+    parser = argparse.ArgumentParser(
+        prog='combustache serve',
+        description='keep templates parsed and compiled and render them on'
+        ' request, requests and responses are json lines',
+    )
+
+    parser.add_argument(
+        '--partial-dir',
+        type=Path,
+        required=True,
+        help='directory with mustache templates and partials',
+    )
+
+    parser.add_argument(
+        '--partial-ext',
+        default='.mustache',
+        help="template file extension (defaults to '.mustache')",
+    )
 
-    output = render(template, data, partials, left_delimiter, right_delimiter)
+    parser.add_argument(
+        '--include-relative-path',
+        action='store_true',
+        help="include template's relative path in its name"
+        ' (defaults to False)',
+    )
+
+    parser.add_argument(
+        '--socket',
+        type=Path,
+        help='unix socket to listen on (defaults to stdin and stdout)',
+    )
+
+    parser.add_argument(
+        '--reload',
+        type=float,
+        metavar='SECONDS',
+        help='check template files for changes at most every SECONDS',
+    )
+
+    parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        help='directory to cache parsed and compiled templates in',
+    )
+
+    args = parser.parse_args(argv)
+
+    from .server import RenderServer, serve_lines
+
+    templates = TemplateDirectory(
+        args.partial_dir,
+        args.partial_ext,
+        include_relative_path=args.include_relative_path,
+        auto_reload=args.reload,
+        disk_cache=DiskCache(args.cache_dir) if args.cache_dir else None,
+    )
+    if args.socket is None:
+        serve_lines(templates, sys.stdin, sys.stdout)
+        return
+    with RenderServer(args.socket, templates) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def client_cli(argv: Sequence[str]):
+    parser = argparse.ArgumentParser(
+        prog='combustache client',
+        description='render a template on a render server',
+    )
+
+    parser.add_argument(
+        'template',
+        help='template name',
+    )
+
+    parser.add_argument(
+        '--socket',
+        type=Path,
+        required=True,
+        help='unix socket of the server',
+    )
+
+    parser.add_argument(
+        '-d',
+        '--data',
+        type=argparse.FileType(),
+        default='-',
+        help='data json file (defaults to stdin)',
+    )
+
+    parser.add_argument(
+        '-o',
+        '--output',
+        type=argparse.FileType('w'),
+        default='-',
+        help='output file (defaults to stdout)',
+    )
+
+    args = parser.parse_args(argv)
+
+    from .server import request
+
+    try:
+        output = request(args.socket, args.template, json.load(args.data))
+    except ServerError as e:
+        parser.exit(1, f'combustache client: error: {e}\n')
     args.output.write(output)
 
 
+def read_records(file: TextIO) -> Iterator[Any]:
+    """
+    Reads newline delimited json records lazily.
+
+    Blank lines are skipped.
+
+    Args:
+        file: Text file-like object.
+
+    Yields:
+        Records.
+
+    Raises:
+        ValueError: Bad json record.
+    """
+    for lineno, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Bad json on line {lineno}: {e}') from e
+
+
 if __name__ == '__main__':
     cli()
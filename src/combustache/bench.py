@@ -0,0 +1,510 @@
+"""
+Benchmark suite of the parse and render hot paths.
+
+Every scenario generates a template, data and partials deterministically,
+so runs on different versions can be compared.
+
+Usage: ::
+
+    $ combustache-bench -o before.json
+    $ combustache-bench -o after.json
+    $ combustache-bench --compare before.json after.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, NamedTuple, Sequence
+
+from .__version__ import __version__
+from .main import Template
+from .nodes import Node, Section
+from .partials import Partials
+
+Scenario = tuple[str, dict[str, Any], dict[str, str]]
+
+
+def wide_table(scale: float) -> Scenario:
+    rows = max(1, int(500 * scale))
+    cols = 20
+    template = (
+        '<table>\n{{#rows}}\n  <tr>{{#cells}}<td>{{value}}</td>{{/cells}}'
+        '<td>{{row.name}}</td></tr>\n{{/rows}}\n</table>\n'
+    )
+    data = {
+        'rows': [
+            {
+                'cells': [{'value': f'{r}x{c}'} for c in range(cols)],
+                'row': {'name': f'<row {r}>'},
+            }
+            for r in range(rows)
+        ]
+    }
+    return template, data, {}
+
+
+def html_table(scale: float) -> Scenario:
+    rows = max(1, int(500 * scale))
+    template = (
+        '<table>\n{{#rows}}\n  <tr><td>{{id}}</td><td>{{name}}</td>'
+        '<td>{{email}}</td><td>{{price}}</td><td>{{active}}</td>'
+        '<td>{{department}}</td><td>{{note}}</td></tr>\n{{/rows}}\n</table>\n'
+    )
+    departments = ['Engineering', 'Sales & Marketing', 'R&D', 'Support']
+    data = {
+        'rows': [
+            {
+                'id': r,
+                'name': f'User {r}' if r % 10 else f"O'Brien <{r}>",
+                'email': f'user{r}@example.com',
+                'price': r * 1.25,
+                'active': r % 2 == 0,
+                'department': departments[r % len(departments)],
+                'note': 'n/a' if r % 3 else 'a longer note without markup',
+            }
+            for r in range(rows)
+        ]
+    }
+    return template, data, {}
+
+
+def deep_nesting(scale: float) -> Scenario:
+    depth = max(1, int(30 * scale))
+    template = ''.join(f'{{{{#l{i}}}}}[{{{{v}}}}' for i in range(depth))
+    template += ''.join(f'{{{{/l{i}}}}}]' for i in reversed(range(depth)))
+    # every fifth level is a list of two items
+    node: Any = None
+    for i in reversed(range(depth)):
+        item = {'v': i}
+        if node is not None:
+            item[f'l{i + 1}'] = node
+        node = [item, item] if i % 5 == 0 else item
+    return template, {'l0': node}, {}
+
+
+def partial_heavy(scale: float) -> Scenario:
+    count = max(1, int(300 * scale))
+    template = '{{#items}}\n  {{>item}}\n{{/items}}\n'
+    partials = {
+        'item': '<li>{{>link}} {{>badge}}</li>\n',
+        'link': '<a href="{{url}}">{{title}}</a>',
+        'badge': '{{#new}}<b>new</b>{{/new}}{{^new}}{{>*kind}}{{/new}}',
+        'plain': '<i>plain</i>',
+    }
+    data = {
+        'items': [
+            {
+                'url': f'/item/{i}',
+                'title': f'Item & {i}',
+                'new': i % 2 == 0,
+                'kind': 'plain',
+            }
+            for i in range(count)
+        ]
+    }
+    return template, data, partials
+
+
+def inheritance_chain(scale: float) -> Scenario:
+    depth = max(1, int(8 * scale))
+    partials = {'layout0': '<html>\n  {{$b0}}default{{/b0}}\n</html>\n'}
+    for i in range(1, depth + 1):
+        partials[f'layout{i}'] = (
+            f'{{{{<layout{i - 1}}}}}\n'
+            f'{{{{$b{i - 1}}}}}\n'
+            f'<div>\n  {{{{$b{i}}}}}level {i}{{{{/b{i}}}}}\n</div>\n'
+            f'{{{{/b{i - 1}}}}}\n'
+            f'{{{{/layout{i - 1}}}}}\n'
+        )
+    template = (
+        f'{{{{#pages}}}}{{{{<layout{depth}}}}}'
+        f'{{{{$b{depth}}}}}{{{{title}}}}{{{{/b{depth}}}}}'
+        f'{{{{/layout{depth}}}}}{{{{/pages}}}}'
+    )
+    data = {'pages': [{'title': f'page {i}'} for i in range(20)]}
+    return template, data, partials
+
+
+def large_text(scale: float) -> Scenario:
+    paragraphs = max(1, int(2000 * scale))
+    paragraph = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit.\n'
+    template = ''.join(
+        paragraph if i % 50 else '{{title}}\n' for i in range(paragraphs)
+    )
+    return template, {'title': 'Title'}, {}
+
+
+def long_line(scale: float) -> Scenario:
+    # minified markup, every tag is on the same line
+    cells = max(1, int(20000 * scale))
+    template = '<table><tr>' + ''.join(
+        f'<td class="c{i % 7}">{{{{v{i % 7}}}}}</td>' for i in range(cells)
+    )
+    template += '</tr></table>'
+    return template, {f'v{i}': f'<{i}>' for i in range(7)}, {}
+
+
+def lambda_heavy(scale: float) -> Scenario:
+    count = max(1, int(300 * scale))
+    template = (
+        '{{#items}}<li>{{#bold}}{{name}}{{/bold}} {{badge}}</li>{{/items}}'
+    )
+    # lambdas return the same few templates again and again
+    data = {
+        'items': [
+            {
+                'name': f'Item & {i}',
+                'bold': lambda text: f'<b>{text}</b>',
+                'badge': (
+                    (lambda: '{{#new}}<i>new {{name}}</i>{{/new}}')
+                    if i % 2
+                    else (lambda: '<i>{{name}}</i>')
+                ),
+                'new': i % 3 == 0,
+            }
+            for i in range(count)
+        ]
+    }
+    return template, data, {}
+
+
+def delimiter_switches(scale: float) -> Scenario:
+    switches = max(1, int(300 * scale))
+    delimiters = [('<%', '%>'), ('[[', ']]'), ('{{', '}}')]
+    parts = []
+    left, right = '{{', '}}'
+    for i in range(switches):
+        new_left, new_right = delimiters[i % len(delimiters)]
+        parts.append(f'{left}={new_left} {new_right}={right}')
+        left, right = new_left, new_right
+        parts.append(f' {left}a{right} {left}#t{right}{left}b{right}')
+        parts.append(f'{left}/t{right}\n')
+    return ''.join(parts), {'a': 'A', 'b': 'B', 't': True}, {}
+
+
+SCENARIOS: dict[str, Callable[[float], Scenario]] = {
+    'wide_table': wide_table,
+    'html_table': html_table,
+    'deep_nesting': deep_nesting,
+    'partial_heavy': partial_heavy,
+    'inheritance_chain': inheritance_chain,
+    'large_text': large_text,
+    'long_line': long_line,
+    'lambda_heavy': lambda_heavy,
+    'delimiter_switches': delimiter_switches,
+}
+
+
+class Result(NamedTuple):
+    """
+    Timing of a benchmark.
+    """
+
+    scenario: str
+    phase: str
+    number: int
+    best: float
+    median: float
+    # template size in bytes, parse throughput is reported from it
+    size: int = 0
+
+
+def phases(
+    source: str, data: dict[str, Any], partials: Partials
+) -> dict[str, Callable[[], Any]]:
+    """
+    Makes the timed functions of a scenario.
+
+    Args:
+        source: Template source.
+        data: Values to insert into the template.
+        partials: Partials to insert into the template.
+
+    Returns:
+        Functions by phase name.
+    """
+    template = Template(source)
+    return {
+        'parse': lambda: Template(source),
+        'render': lambda: template.render(data, partials),
+        'compiled': lambda: template.render(data, partials, compile=True),
+    }
+
+
+def measure(
+    func: Callable[[], Any], repeat: int, min_time: float
+) -> tuple[int, float, float]:
+    """
+    Times a function.
+
+    The function is called in batches taking at least min_time each.
+
+    Args:
+        func: Function to time.
+        repeat: Number of batches.
+        min_time: Minimum batch time in seconds.
+
+    Returns a tuple (number, best, median) where:
+        number: Calls per batch.
+        best: Best time per call in seconds.
+        median: Median time per call in seconds.
+    """
+    start = time.perf_counter()
+    func()
+    once = time.perf_counter() - start
+    number = max(1, int(min_time / once)) if once else 1000
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return number, min(timings), statistics.median(timings)
+
+
+def run(
+    scenarios: Sequence[str],
+    scale: float = 1.0,
+    repeat: int = 5,
+    min_time: float = 0.1,
+) -> list[Result]:
+    """
+    Runs benchmark scenarios.
+
+    Every scenario is timed parsing, rendering interpreted
+    and rendering compiled.
+
+    Args:
+        scenarios: Names of the scenarios.
+        scale: Size multiplier of the generated templates and data.
+        repeat: Number of timed batches.
+        min_time: Minimum batch time in seconds.
+
+    Returns:
+        Timings.
+    """
+    results = []
+    for name in scenarios:
+        source, data, partial_sources = SCENARIOS[name](scale)
+        funcs = phases(source, data, Partials(partial_sources))
+        size = len(source.encode())
+        for phase, func in funcs.items():
+            number, best, median = measure(func, repeat, min_time)
+            results.append(Result(name, phase, number, best, median, size))
+    return results
+
+
+def count_tags(parsed_template: list[Node | str]) -> int:
+    """
+    Counts the tags kept in a parsed template.
+
+    Sections count with their closing tag.
+
+    Args:
+        parsed_template: Parsed template.
+
+    Returns:
+        Number of tags.
+    """
+    count = 0
+    for node in parsed_template:
+        if isinstance(node, Section):
+            count += 2 + count_tags(node.inside._list)
+        elif isinstance(node, Node):
+            count += 1
+    return count
+
+
+def measure_memory(source: str, copies: int) -> tuple[int, int]:
+    """
+    Measures memory of parsed templates.
+
+    Copies of the template are parsed and kept like a template cache does.
+
+    Args:
+        source: Template source.
+        copies: Number of parsed copies.
+
+    Returns a tuple (size, tags) where:
+        size: Bytes allocated by the parsed copies.
+        tags: Number of tags in the parsed copies.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        templates = [Template(source) for _ in range(copies)]
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return size, count_tags(templates[0]._list) * copies
+
+
+def format_memory(
+    scenarios: Sequence[str], scale: float = 1.0, copies: int = 20
+) -> str:
+    """
+    Makes a report of the memory of parsed scenario templates.
+
+    Args:
+        scenarios: Names of the scenarios.
+        scale: Size multiplier of the generated templates.
+        copies: Number of parsed copies of every template.
+
+    Returns:
+        Report table.
+    """
+    lines = [f'{"scenario":<20} {"tags":>8} {"KiB":>10} {"bytes/tag":>10}']
+    for name in scenarios:
+        source = SCENARIOS[name](scale)[0]
+        size, tags = measure_memory(source, copies)
+        lines.append(
+            f'{name:<20} {tags:>8} {size / 1024:>10.1f}'
+            f' {size / max(tags, 1):>10.1f}'
+        )
+    return '\n'.join(lines)
+
+
+def dump(results: list[Result]) -> dict[str, Any]:
+    return {
+        'version': __version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'results': [result._asdict() for result in results],
+    }
+
+
+def load(report: dict[str, Any]) -> list[Result]:
+    return [Result(**result) for result in report['results']]
+
+
+def format_results(results: list[Result]) -> str:
+    lines = [
+        f'{"scenario":<20} {"phase":<9} {"best us":>11} {"median us":>11}'
+        f' {"MB/s":>8}'
+    ]
+    for r in results:
+        # only parsing goes through the whole template text
+        throughput = ''
+        if r.phase == 'parse' and r.size:
+            throughput = f'{r.size / r.best / 1e6:.1f}'
+        lines.append(
+            f'{r.scenario:<20} {r.phase:<9}'
+            f' {r.best * 1e6:>11.1f} {r.median * 1e6:>11.1f}'
+            f' {throughput:>8}'.rstrip()
+        )
+    return '\n'.join(lines)
+
+
+def format_comparison(old: list[Result], new: list[Result]) -> str:
+    old_by_key = {(r.scenario, r.phase): r for r in old}
+    lines = [
+        f'{"scenario":<20} {"phase":<9} {"old us":>11} {"new us":>11}'
+        f' {"change":>8}'
+    ]
+    for r in new:
+        before = old_by_key.get((r.scenario, r.phase))
+        if before is None:
+            continue
+        change = r.best / before.best - 1
+        lines.append(
+            f'{r.scenario:<20} {r.phase:<9} {before.best * 1e6:>11.1f}'
+            f' {r.best * 1e6:>11.1f} {change:>+8.1%}'
+        )
+    return '\n'.join(lines)
+
+
+def cli(argv: Sequence[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog='combustache-bench',
+        description='benchmark combustache parsing and rendering',
+    )
+
+    parser.add_argument(
+        '-s',
+        '--scenario',
+        choices=list(SCENARIOS),
+        action='append',
+        help='scenario to run (can add multiple, defaults to all)',
+    )
+
+    parser.add_argument(
+        '--scale',
+        type=float,
+        default=1.0,
+        help='size multiplier of generated templates (defaults to 1.0)',
+    )
+
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=5,
+        help='number of timed batches (defaults to 5)',
+    )
+
+    parser.add_argument(
+        '--min-time',
+        type=float,
+        default=0.1,
+        help='minimum batch time in seconds (defaults to 0.1)',
+    )
+
+    parser.add_argument(
+        '--memory',
+        action='store_true',
+        help='report the memory of parsed templates instead of timings',
+    )
+
+    parser.add_argument(
+        '-o',
+        '--output',
+        type=argparse.FileType('w'),
+        help='json file to save the results to',
+    )
+
+    parser.add_argument(
+        '--compare',
+        metavar='JSON',
+        type=argparse.FileType(),
+        nargs='+',
+        help='compare with saved results,'
+        ' given two files compares them without running',
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.compare and len(args.compare) > 2:
+        parser.error('--compare takes one or two files')
+
+    if args.memory:
+        print(format_memory(args.scenario or list(SCENARIOS), args.scale))
+        return
+
+    if args.compare and len(args.compare) == 2:
+        old, new = (load(json.load(f)) for f in args.compare)
+        print(format_comparison(old, new))
+        return
+
+    results = run(
+        args.scenario or list(SCENARIOS),
+        args.scale,
+        args.repeat,
+        args.min_time,
+    )
+
+    if args.output:
+        json.dump(dump(results), args.output, indent=2)
+
+    if args.compare:
+        print(format_comparison(load(json.load(args.compare[0])), results))
+    else:
+        print(format_results(results))
+
+
+if __name__ == '__main__':
+    cli()
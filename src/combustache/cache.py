@@ -0,0 +1,136 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Generic, Hashable, NamedTuple, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+def _check_maxsize(maxsize: int | None) -> None:
+    if maxsize is not None and maxsize < 0:
+        raise ValueError(f'Cache size can not be negative: {maxsize}')
+
+
+class CacheInfo(NamedTuple):
+    """
+    Cache statistics.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int | None
+    currsize: int
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Thread-safe least recently used cache.
+    """
+
+    def __init__(self, maxsize: int | None = 128) -> None:
+        """
+        Initializes a cache.
+
+        Args:
+            maxsize: Maximum number of entries (None for unbounded,
+                0 to disable caching).
+
+        Raises:
+            ValueError: Negative maximum size.
+        """
+        _check_maxsize(maxsize)
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._lock = Lock()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def get_or_create(self, key: K, factory: Callable[[], V]) -> V:
+        """
+        Gets a value from the cache, creating and storing it on a miss.
+
+        Args:
+            key: Cache key.
+            factory: Function creating the value.
+
+        Returns:
+            Cached or created value.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return value
+
+        # creating outside the lock so a slow factory does not block
+        # other threads, the worst case is creating the value twice
+        value = factory()
+        if self.maxsize == 0:
+            return value
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+        return value
+
+    def resize(self, maxsize: int | None) -> None:
+        """
+        Changes the maximum cache size, evicting entries if needed.
+
+        Args:
+            maxsize: Maximum number of entries (None for unbounded,
+                0 to disable caching).
+
+        Raises:
+            ValueError: Negative maximum size.
+        """
+        _check_maxsize(maxsize)
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self) -> None:
+        """
+        Removes all entries and resets the statistics.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        """
+        Gets cache statistics.
+
+        Returns:
+            Cache statistics.
+        """
+        with self._lock:
+            return CacheInfo(
+                self.hits,
+                self.misses,
+                self.evictions,
+                self.maxsize,
+                len(self._data),
+            )
+
+    def _evict(self) -> None:
+        if self.maxsize is None:
+            return
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
@@ -0,0 +1,249 @@
+from types import CodeType
+from typing import Any, Callable
+
+from .ctx import MISSING, Ctx
+from .nodes import Ampersand, Interpolation, Inverted, Node, Section, Triple
+from .nodes.section import PLAIN_TYPES, Items, to_items
+from .partials import Partials
+from .util import (
+    Opts,
+    Text,
+    escape_html,
+    escape_value,
+    indent_text,
+    to_str,
+)
+
+RenderFunction = Callable[[Ctx, Partials, Opts], str]
+
+# python refuses to compile more than 20 statically nested blocks
+# and every inlined section takes up to 3 of them
+# so deeper sections get their own functions
+MAX_INLINE_DEPTH = 4
+
+_PROLOGUE = [
+    "stringify = opts['stringify']",
+    "escape = opts['escape']",
+    "missing_data = opts['missing_data']",
+    # the default options are applied in one call
+    'default_escape = escape is escape_html and stringify is to_str',
+    'get_path = ctx.get_path',
+    'push = ctx.stack.append',
+    'pop = ctx.stack.pop',
+    'indentation = ctx.indentation',
+    'out = []',
+    'append = out.append',
+]
+
+
+# names every generated function can refer to
+_BUILTINS: dict[str, Any] = {
+    'MISSING': MISSING,
+    'PLAIN_TYPES': PLAIN_TYPES,
+    'ITEMS': (list, Items),
+    'to_items': to_items,
+    'indent_text': indent_text,
+    'escape_html': escape_html,
+    'escape_value': escape_value,
+    'to_str': to_str,
+}
+
+
+class _CodeGenerator:
+    def __init__(self) -> None:
+        self.constants: dict[str, Any] = {}
+        self.functions: list[list[str]] = []
+
+    def constant(self, value: Any) -> str:
+        name = f'c{len(self.constants)}'
+        self.constants[name] = value
+        return name
+
+    def function(self, parsed_template: list[Node | str]) -> str:
+        name = f'render_{len(self.functions)}'
+        lines = [f'def {name}(ctx, partials, opts):']
+        self.functions.append(lines)
+        lines.extend(f'    {line}' for line in _PROLOGUE)
+        self.body(parsed_template, lines, 1, 0)
+        lines.append("    return ''.join(out)")
+        return name
+
+    def body(
+        self,
+        parsed_template: list[Node | str],
+        lines: list[str],
+        indent: int,
+        depth: int,
+    ) -> None:
+        pad = '    ' * indent
+        for node in parsed_template:
+            if isinstance(node, Text) and node.indents:
+                text = self.constant(node)
+                lines.append(
+                    f'{pad}append(indent_text({text}, {text}.indents,'
+                    f' indentation) if indentation else {node!r})'
+                )
+                continue
+            if isinstance(node, str):
+                if node:
+                    lines.append(f'{pad}append({node!r})')
+                continue
+
+            NodeType = type(node)
+            if NodeType is Interpolation:
+                self.interpolation(
+                    node,
+                    lines,
+                    pad,
+                    'escape_value(v) if default_escape'
+                    ' else escape(stringify(v))',
+                )
+            elif NodeType is Ampersand or NodeType is Triple:
+                self.interpolation(node, lines, pad, 'stringify(v)')
+            elif NodeType is Section or NodeType is Inverted:
+                self.section(node, lines, indent, depth)  # type: ignore
+            else:
+                # partials and inheritance render other templates
+                # so they are left to the nodes themselves
+                const = self.constant(node)
+                lines.append(
+                    f'{pad}append({const}.handle(ctx, partials, opts))'
+                )
+
+    def interpolation(
+        self, node: Node, lines: list[str], pad: str, string: str
+    ) -> None:
+        call = f'{self.constant(node)}.handle_data(v, ctx, partials, opts)'
+        lines.extend(
+            [
+                f'{pad}v = get_path({node.path!r})',
+                f'{pad}if v is MISSING:',
+                f'{pad}    append(missing_data())',
+                f'{pad}elif callable(v):',
+                f'{pad}    append({call})',
+                f'{pad}else:',
+                f'{pad}    append({string})',
+            ]
+        )
+
+    def section(
+        self, node: Section, lines: list[str], indent: int, depth: int
+    ) -> None:
+        pad = '    ' * indent
+        value = f'v{depth}'
+        item = f'i{depth}'
+        lines.extend(
+            [
+                f'{pad}{value} = get_path({node.path!r})',
+                f'{pad}if type({value}) not in PLAIN_TYPES:',
+                f'{pad}    {value} = to_items({value}, ctx)',
+            ]
+        )
+
+        if type(node) is Inverted:
+            lines.extend(
+                [
+                    f'{pad}if not {value} or {value} is MISSING:',
+                    f'{pad}    push({value})',
+                ]
+            )
+            self.inside(node, lines, indent + 1, depth + 1)
+            lines.append(f'{pad}    pop()')
+            return
+
+        call = (
+            f'{self.constant(node)}.handle_data({value}, ctx, partials, opts)'
+        )
+        lines.extend(
+            [
+                f'{pad}if {value} is MISSING:',
+                f'{pad}    append(missing_data())',
+                f'{pad}elif {value}:',
+                f'{pad}    if callable({value}):',
+                f'{pad}        append({call})',
+                f'{pad}    else:',
+                f'{pad}        if not isinstance({value}, ITEMS):',
+                f'{pad}            {value} = [{value}]',
+                f'{pad}        for {item} in {value}:',
+                f'{pad}            push({item})',
+            ]
+        )
+        self.inside(node, lines, indent + 3, depth + 1)
+        lines.append(f'{pad}            pop()')
+
+    def inside(
+        self, node: Section, lines: list[str], indent: int, depth: int
+    ) -> None:
+        if depth < MAX_INLINE_DEPTH:
+            self.body(node.inside._list, lines, indent, depth)
+        else:
+            name = self.function(node.inside._list)
+            pad = '    ' * indent
+            lines.append(f'{pad}append({name}(ctx, partials, opts))')
+
+
+def generate_source(
+    parsed_template: list[Node | str],
+) -> tuple[str, dict[str, Any]]:
+    """
+    Generates Python source code rendering a parsed template.
+
+    Args:
+        parsed_template: Parsed template.
+
+    Returns a tuple (source, constants) where:
+        source: Source code, its first function renders the template.
+        constants: Nodes and text the source code refers to.
+    """
+    generator = _CodeGenerator()
+    generator.function(parsed_template)
+    source = '\n\n'.join('\n'.join(lines) for lines in generator.functions)
+    return source + '\n', generator.constants
+
+
+def compile_code(
+    parsed_template: list[Node | str],
+) -> tuple[CodeType, dict[str, Any]]:
+    """
+    Compiles a parsed template into Python bytecode.
+
+    The bytecode can be marshalled and loaded later with `load_function`.
+
+    Args:
+        parsed_template: Parsed template.
+
+    Returns a tuple (code, constants) where:
+        code: Bytecode defining the render functions.
+        constants: Nodes and text the bytecode refers to.
+    """
+    source, constants = generate_source(parsed_template)
+    return compile(source, '<combustache template>', 'exec'), constants
+
+
+def load_function(code: CodeType, constants: dict[str, Any]) -> RenderFunction:
+    """
+    Loads the render function of compiled bytecode.
+
+    Args:
+        code: Bytecode from `compile_code`.
+        constants: Constants from `compile_code`.
+
+    Returns:
+        Function rendering the template with (ctx, partials, opts).
+    """
+    namespace = {**_BUILTINS, **constants}
+    exec(code, namespace)
+    return namespace['render_0']
+
+
+def compile_template(parsed_template: list[Node | str]) -> RenderFunction:
+    """
+    Compiles a parsed template into a Python function.
+
+    Args:
+        parsed_template: Parsed template.
+
+    Returns:
+        Function rendering the template with (ctx, partials, opts).
+    """
+    return load_function(*compile_code(parsed_template))
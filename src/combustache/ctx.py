@@ -1,7 +1,31 @@
-from typing import Any
+import inspect
+import sys
+from functools import lru_cache
+from typing import Any, Callable
 
 MISSING = object()
 
+KeyPath = tuple[str, ...]
+
+
+@lru_cache(maxsize=4096)
+def key_path(key: str) -> KeyPath:
+    """
+    Splits a dotted name into a key path.
+
+    The keys are interned and '.' becomes an empty path.
+    Nodes with the same name share the path.
+
+    Args:
+        key: Dotted name.
+
+    Returns:
+        Key path.
+    """
+    if key == '.':
+        return ()
+    return tuple(sys.intern(part) for part in key.split('.'))
+
 
 class Ctx:
     """
@@ -11,6 +35,11 @@ class Ctx:
     def __init__(self, stack: list[Any]):
         self.stack = stack
         self.inheritance_args = {}
+        # indentation of the standalone partial being rendered
+        self.indentation = ''
+        # awaitables and iterators are one-shot
+        # so their results are kept for the whole render
+        self.resolved: dict[int, tuple[Any, Any]] = {}
 
     def pop(self, index: int = -1) -> Any:
         return self.stack.pop(index)
@@ -30,19 +59,83 @@ class Ctx:
         Returns:
             Value or MISSING.
         """
-        if key == '.':
-            return self.stack[-1]
+        return self.get_path(key_path(key))
 
-        chain = key.split('.')
+    def get_path(self, path: KeyPath) -> Any:
+        """
+        Gets a value from a context with a key path.
+
+        If nothing was found, combustache.ctx.MISSING is returned.
+
+        Args:
+            path: Key path made by `key_path`.
+
+        Returns:
+            Value or MISSING.
+        """
+        if not path:
+            return self.stack[-1]
 
-        found = self.find_first(chain[0])
-        if found is MISSING:
-            return MISSING
+        found = self.find_first(path[0])
+        if found is MISSING or len(path) == 1:
+            return found
 
-        for key in chain[1:]:
+        for key in path[1:]:
             found = self.deep_get(found, key)
         return found
 
+    async def resolve(self, value: Any) -> Any:
+        """
+        Awaits a value if it is awaitable.
+
+        Every awaitable is awaited only once, later calls return its result.
+
+        Args:
+            value: Value.
+
+        Returns:
+            Awaited or the same value.
+        """
+        if not inspect.isawaitable(value):
+            return value
+        try:
+            return self.resolved[id(value)][1]
+        except KeyError:
+            pass
+        result = await value
+        # the value is kept so its id is not reused
+        self.resolved[id(value)] = (value, result)
+        return result
+
+    async def aget_path(self, path: KeyPath) -> Any:
+        """
+        Gets a value from a context with a key path, awaiting awaitables.
+
+        Awaitable values and awaitable callable results found on the way
+        are awaited before going deeper.
+        If nothing was found, combustache.ctx.MISSING is returned.
+
+        Args:
+            path: Key path made by `key_path`.
+
+        Returns:
+            Value or MISSING.
+        """
+        if not path:
+            return self.stack[-1]
+
+        found = await self.resolve(self.find_first(path[0]))
+        for key in path[1:]:
+            if found is MISSING:
+                break
+            if callable(found):
+                try:
+                    found = await self.resolve(found())
+                except TypeError:
+                    pass
+            found = await self.resolve(get_key(found, key))
+        return found
+
     def find_first(self, key: str):
         rctx = reversed(self.stack)
         for item in rctx:
@@ -54,27 +147,93 @@ class Ctx:
     @staticmethod
     def deep_get(item: Any, key: str) -> Any:
         # if the item is a callable we should be retrieving from its result
-        try:
-            item = item()
-        except TypeError:
-            pass
+        if callable(item):
+            try:
+                item = item()
+            except TypeError:
+                pass
+        return get_key(item, key)
 
-        # try getting a value from a Mapping
-        try:
-            return item[key]
-        except KeyError:
-            return MISSING
-        except TypeError:
-            pass
 
-        # try indexing into the item like a Sequence
-        try:
-            idx = int(key)
-            return item[idx]
-        except IndexError:
-            return MISSING
-        except ValueError:
-            pass
+def get_key(item: Any, key: str) -> Any:
+    """
+    Gets a value from an item with a key.
+
+    If nothing was found, combustache.ctx.MISSING is returned.
 
-        # simple getattr for all other cases
+    Args:
+        item: Item to get the value from.
+        key: Key.
+
+    Returns:
+        Value or MISSING.
+    """
+    item_type = type(item)
+    try:
+        getter = _getters[item_type]
+    except KeyError:
+        getter = _getters[item_type] = _find_getter(item_type)
+    return getter(item, key)
+
+
+@lru_cache(maxsize=1024)
+def _to_index(key: str) -> int | None:
+    try:
+        return int(key)
+    except ValueError:
+        return None
+
+
+def _get_from_dict(item: dict, key: str) -> Any:
+    return item.get(key, MISSING)
+
+
+def _get_from_sequence(item: list | tuple | str, key: str) -> Any:
+    idx = _to_index(key)
+    if idx is None:
         return getattr(item, key, MISSING)
+    if -len(item) <= idx < len(item):
+        return item[idx]
+    return MISSING
+
+
+def _get_attr(item: Any, key: str) -> Any:
+    return getattr(item, key, MISSING)
+
+
+def _get_any(item: Any, key: str) -> Any:
+    # try getting a value from a Mapping
+    try:
+        return item[key]
+    except KeyError:
+        return MISSING
+    except TypeError:
+        pass
+
+    # try indexing into the item like a Sequence
+    try:
+        idx = int(key)
+        return item[idx]
+    except IndexError:
+        return MISSING
+    except ValueError:
+        pass
+
+    # simple getattr for all other cases
+    return getattr(item, key, MISSING)
+
+
+def _find_getter(item_type: type) -> Callable[[Any, str], Any]:
+    # only exact builtin types get the fast paths
+    # as subclasses can change how indexing works (e.g. defaultdict)
+    if item_type is dict:
+        return _get_from_dict
+    if item_type in (list, tuple, str):
+        return _get_from_sequence
+    if not hasattr(item_type, '__getitem__'):
+        return _get_attr
+    return _get_any
+
+
+# value getter for every type of context item seen so far
+_getters: dict[type, Callable[[Any, str], Any]] = {}
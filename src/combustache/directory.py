@@ -0,0 +1,249 @@
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Mapping
+
+from . import main
+from .exceptions import CombustacheError
+from .nodes import Node, Parent, Partial, Section
+from .partials import Partials
+from .util import StrPath, find_template_files, template_name
+
+if TYPE_CHECKING:
+    from .diskcache import DiskCache
+
+
+def find_dependencies(parsed_template: list[Node | str]) -> set[str]:
+    """
+    Finds names of the partials and parents a parsed template uses.
+
+    Dynamic partials are left out as their names are only known
+    while rendering.
+
+    Args:
+        parsed_template: Parsed template.
+
+    Returns:
+        Partial and parent names.
+    """
+    names = set()
+    for node in parsed_template:
+        if isinstance(node, Partial):
+            if node.contents[0] != '*':
+                names.add(node.contents)
+        elif isinstance(node, Section):
+            if isinstance(node, Parent):
+                names.add(node.contents)
+            names |= find_dependencies(node.inside._list)
+    return names
+
+
+class TemplateDirectory(Mapping[str, str]):
+    """
+    Templates of a directory reloaded when their files change.
+
+    Files are polled by modification time and size,
+    only new and changed files are read and parsed again.
+    The partial and parent dependency graph of the templates
+    tells which templates a change affects.
+    Usable as partials wherever a partials dictionary is.
+
+    Example::
+
+        >>> templates = TemplateDirectory('./templates/', '.mustache')
+        >>> templates.render('index', {'username': 'world'})
+        '<h1> Welcome, world! </h1>'
+        >>> # after editing ui/comment.mustache
+        >>> templates.refresh()
+        {'comment', 'index'}
+    """
+
+    def __init__(
+        self,
+        path: StrPath,
+        extension: str,
+        *,
+        include_relative_path: bool = False,
+        auto_reload: float | None = None,
+        disk_cache: 'DiskCache | None' = None,
+    ) -> None:
+        """
+        Loads templates of a directory.
+
+        Args:
+            path: Root directory path.
+            extension: Template file extension.
+
+        Keyword args:
+            include_relative_path: Include template's relative path
+                in its name.
+            auto_reload: Minimum number of seconds between checking files
+                for changes on `get_template` and `render`
+                (None to only check on `refresh`).
+            disk_cache: Persistent cache to load parsed templates from.
+
+        Raises:
+            DelimiterError: Bad delimiter tag.
+            MissingClosingTagError: Missing closing tag.
+            StrayClosingTagError: Stray closing tag.
+        """
+        self.path = Path(path)
+        self.extension = extension
+        self.include_relative_path = include_relative_path
+        self.auto_reload = auto_reload
+        self.partials = Partials(self, disk_cache=disk_cache)
+        # file path and (modification time, size) of every template
+        self._files: dict[str, tuple[Path, tuple[int, int]]] = {}
+        self._sources: dict[str, str] = {}
+        self._dependencies: dict[str, frozenset[str]] = {}
+        self._checked = 0.0
+        self.refresh()
+
+    def __getitem__(self, name: str) -> str:
+        return self._sources[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._sources)
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    def refresh(self) -> set[str]:
+        """
+        Reloads new, changed and deleted templates.
+
+        Templates that fail to parse are kept without dependencies,
+        the error is raised when they are rendered.
+
+        Returns:
+            Names of the reloaded templates and the templates
+            depending on them.
+        """
+        self._checked = time.monotonic()
+        files = {}
+        for path in find_template_files(self.path, self.extension):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            name = template_name(
+                path, self.extension, self.include_relative_path, self.path
+            )
+            files[name] = (path, (stat.st_mtime_ns, stat.st_size))
+
+        changed = set(self._files.keys() - files.keys())
+        for name, file in list(files.items()):
+            if self._files.get(name) == file:
+                continue
+            try:
+                self._sources[name] = file[0].read_text()
+            except FileNotFoundError:
+                del files[name]
+            changed.add(name)
+        self._files = files
+
+        for name in changed:
+            if name not in files:
+                self._sources.pop(name, None)
+                self._dependencies.pop(name, None)
+                continue
+            # parsed here so rendering does not wait for it
+            try:
+                template = self.partials.get_template(name)
+            except CombustacheError:
+                template = None
+            self._dependencies[name] = frozenset(
+                find_dependencies(template._list) if template else ()
+            )
+        return changed | self._dependents(changed)
+
+    def dependencies(self, name: str) -> frozenset[str]:
+        """
+        Gets names of the partials and parents a template uses directly.
+
+        Args:
+            name: Template name.
+
+        Returns:
+            Partial and parent names, including ones with no template.
+        """
+        return self._dependencies.get(name, frozenset())
+
+    def dependents(self, name: str) -> set[str]:
+        """
+        Gets names of the templates using a template directly or through
+        other templates.
+
+        Args:
+            name: Template name.
+
+        Returns:
+            Template names.
+        """
+        return self._dependents({name})
+
+    def graph(self) -> dict[str, frozenset[str]]:
+        """
+        Gets the dependency graph.
+
+        Returns:
+            Names of the partials and parents every template uses directly.
+        """
+        return dict(self._dependencies)
+
+    def get_template(self, name: str) -> 'main.Template | None':
+        """
+        Gets a parsed template.
+
+        Args:
+            name: Template name.
+
+        Returns:
+            Parsed template or None if there is no such template.
+
+        Raises:
+            DelimiterError: Bad delimiter tag.
+            MissingClosingTagError: Missing closing tag.
+            StrayClosingTagError: Stray closing tag.
+        """
+        if (
+            self.auto_reload is not None
+            and time.monotonic() - self._checked >= self.auto_reload
+        ):
+            self.refresh()
+        return self.partials.get_template(name)
+
+    def render(self, name: str, data: Any, **kwargs: Any) -> str:
+        """
+        Renders a template with the directory as its partials.
+
+        Args:
+            name: Template name.
+            data: Values to insert into the template.
+            **kwargs: Keyword args of `Template.render`.
+
+        Returns:
+            Rendered template.
+
+        Raises:
+            KeyError: No such template.
+            DelimiterError: Bad delimiter tag.
+            MissingClosingTagError: Missing closing tag.
+            StrayClosingTagError: Stray closing tag.
+        """
+        template = self.get_template(name)
+        if template is None:
+            raise KeyError(name)
+        return template.render(data, self.partials, **kwargs)
+
+    def _dependents(self, names: Iterable[str]) -> set[str]:
+        dependents: set[str] = set()
+        pending = set(names)
+        while pending:
+            found = {
+                name
+                for name, uses in self._dependencies.items()
+                if not uses.isdisjoint(pending) and name not in dependents
+            }
+            dependents |= found
+            pending = found
+        return dependents
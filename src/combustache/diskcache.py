@@ -0,0 +1,232 @@
+import hashlib
+import marshal
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from . import main
+from .__version__ import __version__
+from .cache import LRUCache
+from .compiler import compile_code, load_function
+from .util import StrPath
+
+MAX_SIZE = 64 << 20
+
+_SUFFIX = '.pickle'
+_MEMORY_SIZE = 256
+# errors of unpickling and unmarshaling a corrupt, truncated
+# or foreign file, anything else is a bug and is raised
+_LOAD_ERRORS = (
+    pickle.UnpicklingError,
+    EOFError,
+    ValueError,
+    TypeError,
+    AttributeError,
+    ImportError,
+)
+
+
+class DiskCache:
+    """
+    Persistent cache of parsed and compiled templates.
+
+    Every template is stored in its own file in the cache directory
+    together with its compiled bytecode, so a new process loads it
+    instead of parsing and compiling it again.
+    Files are keyed by a hash of the template text, delimiters,
+    combustache version and Python bytecode version,
+    so changed templates and upgrades never get stale entries.
+    Recently used templates are also kept in memory.
+    Edited templates leave their old files behind, so when the files
+    grow past a size limit the least recently used ones are removed.
+
+    Cache files are unpickled, only use a directory you trust.
+
+    Example::
+
+        >>> cache = DiskCache('~/.cache/combustache')
+        >>> template = cache.get_template('Hello {{name}}!')
+        >>> template.render({'name': 'world'}, compile=True)
+        'Hello world!'
+    """
+
+    def __init__(self, path: StrPath, max_size: int | None = MAX_SIZE) -> None:
+        """
+        Initializes a disk cache.
+
+        The directory is created on the first write.
+
+        Args:
+            path: Cache directory path.
+            max_size: Maximum total size of the cache files in bytes
+                (None for no limit).
+        """
+        self.path = Path(path).expanduser()
+        self.max_size = max_size
+        # total size of the cache files, counted on the first write
+        # and kept up to date with the writes of this instance
+        self._size: int | None = None
+        self._memory: LRUCache[tuple[str, str, str], main.Template] = LRUCache(
+            _MEMORY_SIZE
+        )
+
+    def __getstate__(self) -> dict[str, Any]:
+        # the templates kept in memory and their lock are not pickled
+        return {'path': self.path, 'max_size': self.max_size}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.path = state['path']
+        self.max_size = state['max_size']
+        self._size = None
+        self._memory = LRUCache(_MEMORY_SIZE)
+
+    def get_template(
+        self,
+        template: str,
+        left_delimiter: str = '{{',
+        right_delimiter: str = '}}',
+    ) -> 'main.Template':
+        """
+        Gets a parsed and compiled template.
+
+        The template is loaded from the cache directory or parsed,
+        compiled and stored there.
+
+        Args:
+            template: Mustache template.
+            left_delimiter: Left tag delimiter.
+            right_delimiter: Right tag delimiter.
+
+        Returns:
+            Parsed template.
+
+        Raises:
+            DelimiterError: Bad delimiter tag.
+            MissingClosingTagError: Missing closing tag.
+            StrayClosingTagError: Stray closing tag.
+        """
+        return self._memory.get_or_create(
+            (template, left_delimiter, right_delimiter),
+            lambda: self._load(template, left_delimiter, right_delimiter),
+        )
+
+    def clear(self) -> None:
+        """
+        Removes all cache files and templates kept in memory.
+        """
+        self._memory.clear()
+        for path in self.path.glob(f'*{_SUFFIX}'):
+            path.unlink(missing_ok=True)
+        self._size = 0
+
+    def prune(self, max_size: int) -> int:
+        """
+        Removes the least recently used cache files until the rest
+        take at most max_size bytes.
+
+        Templates kept in memory are not affected.
+
+        Args:
+            max_size: Maximum total size of the cache files in bytes.
+
+        Returns:
+            Number of removed files.
+        """
+        files = []
+        for path in self.path.glob(f'*{_SUFFIX}'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+        files.sort()
+
+        size = sum(file_size for _, file_size, _ in files)
+        removed = 0
+        for _, file_size, path in files:
+            if size <= max_size:
+                break
+            path.unlink(missing_ok=True)
+            size -= file_size
+            removed += 1
+        self._size = size
+        return removed
+
+    def _file(
+        self, template: str, left_delimiter: str, right_delimiter: str
+    ) -> Path:
+        key = '\0'.join(
+            (
+                __version__,
+                sys.implementation.cache_tag or '',
+                left_delimiter,
+                right_delimiter,
+                template,
+            )
+        )
+        digest = hashlib.sha256(key.encode(errors='surrogatepass'))
+        return self.path / f'{digest.hexdigest()}{_SUFFIX}'
+
+    def _load(
+        self, template: str, left_delimiter: str, right_delimiter: str
+    ) -> 'main.Template':
+        path = self._file(template, left_delimiter, right_delimiter)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            pass
+        else:
+            try:
+                parsed, constants, code = pickle.loads(data)
+                parsed._compiled = load_function(
+                    marshal.loads(code), constants
+                )
+                self._touch(path)
+                return parsed
+            except _LOAD_ERRORS:
+                # a corrupt or foreign file is replaced
+                pass
+
+        parsed = main.Template(template, left_delimiter, right_delimiter)
+        code, constants = compile_code(parsed._list)
+        parsed._compiled = load_function(code, constants)
+        self._store(path, (parsed, constants, marshal.dumps(code)))
+        return parsed
+
+    def _store(self, path: Path, entry: tuple[Any, ...]) -> None:
+        # written to a temporary file and renamed so other processes
+        # never read a partially written file
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+                    size = f.tell()
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            if self.max_size is None:
+                return
+            # the directory is only listed again when the files
+            # may have grown past the limit
+            if self._size is None or self._size + size > self.max_size:
+                self.prune(self.max_size)
+            else:
+                self._size += size
+        except OSError:
+            # a read-only cache only costs the time saved
+            pass
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        # the modification time marks when a file was last used
+        # so pruning removes the ones unused for the longest
+        try:
+            os.utime(path)
+        except OSError:
+            pass
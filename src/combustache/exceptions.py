@@ -28,3 +28,11 @@ class StrayClosingTagError(CombustacheError):
     """
 
     pass
+
+
+class ServerError(CombustacheError):
+    """
+    A render server failed to render a request.
+    """
+
+    pass
@@ -0,0 +1,245 @@
+"""
+Lazy json decoding for rendering documents larger than memory.
+
+Objects are decoded up to the keys looked up in them and arrays are
+decoded item by item as they are iterated, so a template rendering
+a huge array streams it instead of holding the whole document.
+
+Typical usage: ::
+
+    >>> with open('export.json') as f:
+    ...     template.render_to(stream_json(f), out)
+"""
+
+import json
+import re
+from collections import deque
+from typing import Any, Iterator, Mapping
+
+from .ctx import MISSING
+from .util import SupportsRead
+
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r'[ \t\n\r]*')
+
+
+class _Reader:
+    """
+    Buffered json text reader.
+    """
+
+    def __init__(self, fp: SupportsRead, chunk_size: int) -> None:
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size: int) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fp.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        # the parsed part of the buffer is dropped
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        # skips whitespace, returns '' at the end of the text
+        while True:
+            match = _whitespace.match(self.buffer, self.pos)
+            self.pos = match.end()  # type: ignore
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill(self.chunk_size):
+                return ''
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self.error(f'Expecting {char!r} delimiter')
+        self.pos += 1
+
+    def error(self, msg: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(msg, self.buffer, self.pos)
+
+    def value(self) -> Any:
+        # decodes the next value whole
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # the value may continue in the unread part of the text,
+                # reading as much as is buffered keeps retries linear
+                if self.fill(max(self.chunk_size, len(self.buffer))):
+                    continue
+                raise
+            # so may a number ending the buffer or a part of it
+            if (
+                end == len(self.buffer) or self.buffer[end] in '.eE'
+            ) and self.fill(self.chunk_size):
+                continue
+            self.pos = end
+            return value
+
+    def lazy_value(self) -> Any:
+        char = self.peek()
+        if char == '{':
+            self.pos += 1
+            return JsonObject(self)
+        if char == '[':
+            self.pos += 1
+            return JsonArray(self)
+        return self.value()
+
+
+class JsonObject(Mapping[str, Any]):
+    """
+    Json object decoded as its keys are looked up.
+
+    Values before a looked up key are kept. Objects and arrays in it
+    are lazy too, an array read past before being iterated is kept whole.
+    """
+
+    def __init__(self, reader: _Reader) -> None:
+        self._reader = reader
+        self._values: dict[str, Any] = {}
+        self._done = False
+        self._first = True
+        # the last lazy value, read to its end before reading further
+        self._active: JsonObject | JsonArray | None = None
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        while (pair := self._read()) is not None:
+            if pair[0] == key:
+                return pair[1]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        self.drain()
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        self.drain()
+        return len(self._values)
+
+    def __bool__(self) -> bool:
+        # only decodes up to the first key
+        return bool(self._values) or self._read() is not None
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self._values!r}, done={self._done})'
+
+    def drain(self) -> None:
+        """
+        Decodes the rest of the object.
+        """
+        while self._read() is not None:
+            pass
+
+    def _read(self) -> tuple[str, Any] | None:
+        if self._done:
+            return None
+        if self._active is not None:
+            self._active.drain()
+            self._active = None
+
+        reader = self._reader
+        if reader.peek() == '}':
+            reader.pos += 1
+            self._done = True
+            return None
+        if not self._first:
+            reader.expect(',')
+        self._first = False
+
+        if reader.peek() != '"':
+            raise reader.error(
+                'Expecting property name enclosed in double quotes'
+            )
+        key = reader.value()
+        reader.expect(':')
+        value = reader.lazy_value()
+        if isinstance(value, (JsonObject, JsonArray)):
+            self._active = value
+        self._values[key] = value
+        return key, value
+
+
+class JsonArray:
+    """
+    Json array decoded item by item as it is iterated.
+
+    Iterates only once and can not be indexed. Items are decoded whole.
+    """
+
+    def __init__(self, reader: _Reader) -> None:
+        self._reader = reader
+        # items read ahead when the text after the array was needed
+        self._buffered: deque[Any] = deque()
+        self._done = False
+        self._first = True
+
+    def __iter__(self) -> 'JsonArray':
+        return self
+
+    def __next__(self) -> Any:
+        if self._buffered:
+            return self._buffered.popleft()
+        item = self._read()
+        if item is MISSING:
+            raise StopIteration
+        return item
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}(done={self._done})'
+
+    def drain(self) -> None:
+        """
+        Decodes the rest of the array, keeping the items for iteration.
+        """
+        while (item := self._read()) is not MISSING:
+            self._buffered.append(item)
+
+    def _read(self) -> Any:
+        if self._done:
+            return MISSING
+        reader = self._reader
+        if reader.peek() == ']':
+            reader.pos += 1
+            self._done = True
+            return MISSING
+        if not self._first:
+            reader.expect(',')
+        self._first = False
+        return reader.value()
+
+
+def stream_json(fp: SupportsRead, chunk_size: int = CHUNK_SIZE) -> Any:
+    """
+    Decodes a json document lazily.
+
+    Objects become `JsonObject` mappings and arrays become `JsonArray`
+    iterators, both reading the file only as far as they are used.
+    The file has to stay open while the data is used.
+
+    Args:
+        fp: Text file-like object.
+        chunk_size: Number of characters read at a time.
+
+    Returns:
+        Decoded document.
+
+    Raises:
+        JSONDecodeError: Bad json, possibly only while the data is used.
+    """
+    return _Reader(fp, chunk_size).lazy_value()
@@ -1,7 +1,23 @@
-import html
-from typing import Any, Callable, Type
+import re
+from functools import cached_property, lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterator,
+    Mapping,
+    Type,
+)
 
+from .cache import LRUCache
+from .compiler import RenderFunction, compile_template
 from .ctx import Ctx
+from .exceptions import (
+    DelimiterError,
+    MissingClosingTagError,
+    StrayClosingTagError,
+)
 from .nodes import (
     Ampersand,
     Block,
@@ -16,7 +32,21 @@ from .nodes import (
     Section,
     Triple,
 )
-from .util import Opts, to_str
+from .partials import Partials
+from .util import (
+    LineIndex,
+    Opts,
+    SupportsWrite,
+    Text,
+    escape_html,
+    find_position,
+    indent_text,
+    no_data,
+    to_str,
+)
+
+if TYPE_CHECKING:
+    from .profiler import Profiler
 
 _node_types: dict[str, type[Node]] = {
     node.left: node
@@ -33,6 +63,65 @@ _node_types: dict[str, type[Node]] = {
         Parent,
     }
 }
+# types in the order of their tag_pattern groups
+_tag_types: tuple[type[Node], ...] = (*_node_types.values(), Interpolation)
+
+
+@lru_cache(maxsize=64)
+def tag_pattern(left_delimiter: str, right_delimiter: str) -> re.Pattern[str]:
+    """
+    Compiles the pattern matching tags of a delimiter pair.
+
+    The pattern matches at the first left delimiter.
+    Group n holds the contents of a tag of the n-th `_tag_types` type,
+    no group matching means the delimiter does not start a closed tag.
+
+    Args:
+        left_delimiter: Left tag delimiter.
+        right_delimiter: Right tag delimiter.
+
+    Returns:
+        Compiled pattern.
+    """
+    right = re.escape(right_delimiter)
+    alternatives = []
+    for NodeType in _tag_types[:-1]:
+        closing = re.escape(NodeType.right) + right
+        # the closing delimiter is searched for from the type character
+        # so a tag like {{=}} is not closed by a later =}}
+        alternatives.append(
+            f'(?!{closing}){re.escape(NodeType.left)}(.*?){closing}'
+        )
+    types = ''.join(re.escape(char) for char in _node_types)
+    alternatives.append(f'(?![{types}])(.*?){right}')
+    alternatives.append('')
+    return re.compile(
+        f'{re.escape(left_delimiter)}(?:{"|".join(alternatives)})',
+        re.DOTALL,
+    )
+
+
+def match_node(
+    pattern: re.Pattern[str],
+    template: str,
+    search_start: int,
+    template_end: int,
+) -> tuple[Type[Node], str, int, int] | None:
+    """
+    Finds the first node from the search_start in a template
+    with a `tag_pattern` pattern.
+
+    Returns a tuple (NodeType, contents, left_outside_idx, right_outside_idx)
+    or None like `find_node`.
+    """
+    match = pattern.search(template, search_start, template_end)
+    if match is None:
+        return None
+    group = match.lastindex
+    if group is None:
+        return None
+    contents = match.group(group).strip()
+    return _tag_types[group - 1], contents, match.start(), match.end()
 
 
 def find_node(
@@ -53,39 +142,192 @@ def find_node(
         right_outside_idx: Index where the node ends.
     """
     # Hello {{> hello.world }}!
-    #       ^ ^^            ^ ^
-    #       1 23            4 5
+    #       ^               ^
+    #       1               2
     # 1. left_outside_idx
-    # 2. left_char_idx
-    # 3. left_inside_idx
-    # 4. right_inside_idx
-    # 5. right_outside_idx
-    left_outside_idx = template.find(
-        left_delimiter, search_start, template_end
+    # 2. right_outside_idx
+    return match_node(
+        tag_pattern(left_delimiter, right_delimiter),
+        template,
+        search_start,
+        template_end,
     )
-    if left_outside_idx < search_start:
-        return None
 
-    left_char_idx = left_outside_idx + len(left_delimiter)
-    if left_char_idx >= template_end:
-        return None
 
-    NodeType = _node_types.get(template[left_char_idx], Interpolation)
-    node_left_char = NodeType.left
-    node_right_char = NodeType.right
+def _text(template: str, start: int, end: int, next_node: Node | None) -> str:
+    line_start = start == 0 or template[start - 1] == '\n'
+    if not line_start and template.find('\n', start, end) == -1:
+        return template[start:end]
+    text = Text(template[start:end])
+    text.line_start = line_start
+    # a line starting right before a tag is indented
+    # unless the tag is standalone and its line is removed
+    text.include_end = next_node is not None and not (
+        next_node.standalonable and next_node.is_standalone
+    )
+    return text
 
-    left_inside_idx = left_char_idx + len(node_left_char)
 
-    new_right_delimiter = node_right_char + right_delimiter
-    right_inside_idx = template.find(
-        new_right_delimiter, left_char_idx, template_end
+def _unclosed_section(
+    template: str,
+    stack: list[tuple[Section, list[Node | str], int]],
+    template_end: int,
+) -> Section | None:
+    # errors are reported the way sections reported them when they
+    # looked for their closing tag before their contents were parsed:
+    # the outermost open section with no closing tag of its type after it
+    # is missing one before anything inside it is wrong
+    for section, _, _ in stack:
+        pattern = tag_pattern(section.left_delimiter, section.right_delimiter)
+        depth = 0
+        search_start = section.actual_end
+        while True:
+            node_info = match_node(
+                pattern, template, search_start, template_end
+            )
+            if node_info is None:
+                return section
+            NodeType, contents, start, end = node_info
+            if contents == section.contents:
+                if NodeType is type(section):
+                    depth += 1
+                elif NodeType is Closing:
+                    if depth == 0:
+                        break
+                    depth -= 1
+            search_start = end
+        # the sections above it have to close before it does
+        template_end = start
+    return None
+
+
+def _missing_closing_tag(template: str, section: Section) -> Exception:
+    row, col = find_position(template, section.tag_start)
+    return MissingClosingTagError(
+        f'No closing tag found: {section.tag_string} at {row}:{col}'
     )
-    if right_inside_idx < left_inside_idx:
-        return None
 
-    right_outside_idx = right_inside_idx + len(new_right_delimiter)
-    contents = template[left_inside_idx:right_inside_idx].strip()
-    return NodeType, contents, left_outside_idx, right_outside_idx
+
+def _indent(text: str, indentation: str) -> str:
+    if indentation and isinstance(text, Text):
+        return indent_text(text, text.indents, indentation)
+    return text
+
+
+def parse(
+    template: str,
+    left_delimiter: str = '{{',
+    right_delimiter: str = '}}',
+    template_start: int = 0,
+    template_end: int | None = None,
+) -> list[Node | str]:
+    """
+    Parses a template into a list of nodes and strings.
+
+    The template is scanned once, open sections are kept on a stack
+    and get their contents when their closing tag is found.
+
+    Args:
+        template: Mustache template.
+        left_delimiter: Left tag delimiter.
+        right_delimiter: Right tag delimiter.
+        template_start: Template start index.
+        template_end: Template end index.
+
+    Returns:
+        Parsed template.
+
+    Raises:
+        DelimiterError: Bad delimiter tag.
+        MissingClosingTagError: Missing closing tag.
+        StrayClosingTagError: Stray closing tag.
+    """
+    if template_end is None:
+        template_end = len(template)
+    parsed_template: list[Node | str] = []
+    # open sections with the list they will be added to
+    # and the start of the text preceding them
+    # the preceding text is added only on closing as standalone blocks
+    # and parents can move their start
+    stack: list[tuple[Section, list[Node | str], int]] = []
+    lines = LineIndex(template)
+    pattern = tag_pattern(left_delimiter, right_delimiter)
+    search_start = template_start
+    while True:
+        node_info = match_node(pattern, template, search_start, template_end)
+
+        if node_info is None:
+            if stack:
+                section = _unclosed_section(template, stack, template_end)
+                raise _missing_closing_tag(template, section or stack[0][0])
+            parsed_template.append(
+                _text(template, search_start, template_end, None)
+            )
+            break
+
+        NodeType, contents, start, end = node_info
+        try:
+            node = NodeType(
+                contents,
+                start,
+                end,
+                template,
+                template_start,
+                template_end,
+                left_delimiter,
+                right_delimiter,
+                lines,
+            )
+        except DelimiterError:
+            section = _unclosed_section(template, stack, template_end)
+            if section is None:
+                raise
+            raise _missing_closing_tag(template, section) from None
+
+        if NodeType is Delimiter:
+            left_delimiter = node.left_delimiter
+            right_delimiter = node.right_delimiter
+            pattern = tag_pattern(left_delimiter, right_delimiter)
+
+        if isinstance(node, Section):
+            stack.append((node, parsed_template, search_start))
+            parsed_template = []
+            search_start = node.actual_end
+            continue
+
+        parsed_template.append(
+            _text(template, search_start, node.actual_start, node)
+        )
+
+        if isinstance(node, Closing):
+            if not stack or stack[-1][0].contents != contents:
+                section = _unclosed_section(template, stack, template_end)
+                # the tag closes a section opened further up the stack
+                # so the sections above it are missing their closing tags
+                if section is None and any(
+                    section.contents == contents for section, _, _ in stack
+                ):
+                    section = stack[-1][0]
+                if section is not None:
+                    raise _missing_closing_tag(template, section)
+                row, col = find_position(template, node.tag_start)
+                raise StrayClosingTagError(
+                    'Stray closing tag found: '
+                    f'{node.tag_string} at {row}:{col}'
+                )
+            section, outer_template, text_start = stack.pop()
+            section.close(node, Template._from_parsed(parsed_template))
+            parsed_template = outer_template
+            parsed_template.append(
+                _text(template, text_start, section.actual_start, section)
+            )
+            node = section
+
+        if not node.ignorable:
+            parsed_template.append(node)
+        search_start = node.parse_end
+
+    return parsed_template
 
 
 class Template:
@@ -93,6 +335,10 @@ class Template:
     Mustache template.
     """
 
+    _compiled: RenderFunction | None = None
+    # renders of a template returned by lambdas
+    _renders = 0
+
     def __init__(
         self,
         template: str,
@@ -116,47 +362,63 @@ class Template:
             MissingClosingTagError: Missing closing tag.
             StrayClosingTagError: Stray closing tag.
         """
-        if template_end is None:
-            template_end = len(template)
-        parsed_template = []
-        search_start = template_start
-        while True:
-            node_info = find_node(
-                template,
-                search_start,
-                template_end,
-                left_delimiter,
-                right_delimiter,
-            )
+        self._list: list[Node | str] = parse(
+            template,
+            left_delimiter,
+            right_delimiter,
+            template_start,
+            template_end,
+        )
 
-            if node_info is None:
-                parsed_template.append(template[search_start:template_end])
-                break
+    @cached_property
+    def _has_inheritance(self) -> bool:
+        # blocks and parents depend on the whitespace of their source
+        # so their templates can not be indented while rendering
+        return any(
+            isinstance(node, (Block, Parent))
+            or isinstance(node, Section)
+            and node.inside._has_inheritance
+            for node in self._list
+        )
 
-            NodeType, contents, start, end = node_info
-            node = NodeType(
-                contents,
-                start,
-                end,
-                template,
-                template_start,
-                template_end,
-                left_delimiter,
-                right_delimiter,
-            )
+    @classmethod
+    def _from_parsed(cls, parsed_template: list[Node | str]) -> 'Template':
+        template = cls.__new__(cls)
+        template._list = parsed_template
+        return template
 
-            if NodeType is Delimiter:
-                left_delimiter = node.left_delimiter
-                right_delimiter = node.right_delimiter
+    def __getstate__(self) -> dict[str, Any]:
+        # generated functions can not be pickled, they are compiled again
+        state = self.__dict__.copy()
+        state.pop('_compiled', None)
+        return state
 
-            parsed_template.append(template[search_start : node.actual_start])
-            if not node.ignorable:
-                parsed_template.append(node)
-            search_start = node.parse_end
+    def compile(self) -> RenderFunction:
+        """
+        Compiles the template into a Python function.
 
-        self._list: list[Node | str] = parsed_template
+        The function is generated once and reused afterwards.
 
-    def _render(self, ctx: Ctx, partials: dict[str, str], opts: Opts) -> str:
+        Returns:
+            Function rendering the template with (ctx, partials, opts).
+        """
+        if self._compiled is None:
+            self._compiled = compile_template(self._list)
+        return self._compiled
+
+    def _render(self, ctx: Ctx, partials: Partials, opts: Opts) -> str:
+        if opts['compile']:
+            return self.compile()(ctx, partials, opts)
+        return self._interpret(ctx, partials, opts)
+
+    def _interpret(self, ctx: Ctx, partials: Partials, opts: Opts) -> str:
+        if ctx.indentation:
+            return ''.join(
+                node.handle(ctx, partials, opts)
+                if isinstance(node, Node)
+                else _indent(node, ctx.indentation)
+                for node in self._list
+            )
         return ''.join(
             node.handle(ctx, partials, opts)
             if isinstance(node, Node)
@@ -164,14 +426,38 @@ class Template:
             for node in self._list
         )
 
+    def _iter(self, ctx: Ctx, partials: Partials, opts: Opts) -> Iterator[str]:
+        for node in self._list:
+            if isinstance(node, Node):
+                yield from node.iter_handle(ctx, partials, opts)
+            else:
+                # empty text can still start an indented line
+                text = _indent(node, ctx.indentation)
+                if text:
+                    yield text
+
+    async def _aiter(
+        self, ctx: Ctx, partials: Partials, opts: Opts
+    ) -> AsyncIterator[str]:
+        for node in self._list:
+            if isinstance(node, Node):
+                async for chunk in node.aiter_handle(ctx, partials, opts):
+                    yield chunk
+            else:
+                text = _indent(node, ctx.indentation)
+                if text:
+                    yield text
+
     def render(
         self,
         data: dict[str, Any],
-        partials: dict[str, str] | None = None,
+        partials: Mapping[str, str] | None = None,
         *,
         stringify: Callable[[Any], str] | None = None,
         escape: Callable[[str], str] | None = None,
         missing_data: Callable[[], Any] | None = None,
+        compile: bool = False,
+        profile: 'Profiler | None' = None,
     ) -> str:
         """
         Renders a mustache template.
@@ -184,43 +470,304 @@ class Template:
             stringify: String conversion function.
             escape: Escaping function.
             missing_data: Function called on missing data.
+            compile: Compile the template and partials into functions.
+            profile: Profiler recording the render.
 
         Returns:
             Rendered template.
         """
-        opts: Opts = {
-            'stringify': stringify or to_str,
-            'escape': escape or html.escape,
-            'missing_data': missing_data or (lambda: ''),
-        }
-        if partials is None:
-            partials = {}
+        opts = _make_opts(stringify, escape, missing_data, compile)
+        if not isinstance(partials, Partials):
+            partials = Partials(partials)
         ctx = Ctx([data])
+        if profile is not None:
+            with profile:
+                return self._render(ctx, partials, opts)
         return self._render(ctx, partials, opts)
 
+    def render_iter(
+        self,
+        data: dict[str, Any],
+        partials: Mapping[str, str] | None = None,
+        *,
+        stringify: Callable[[Any], str] | None = None,
+        escape: Callable[[str], str] | None = None,
+        missing_data: Callable[[], Any] | None = None,
+    ) -> Iterator[str]:
+        """
+        Renders a mustache template chunk by chunk.
+
+        Sections, partials and inheritance are streamed as they render,
+        so the whole output is never held in memory.
+
+        Args:
+            data: Values to insert into the template.
+            partials: Partials to insert into the template.
+
+        Keyword args:
+            stringify: String conversion function.
+            escape: Escaping function.
+            missing_data: Function called on missing data.
+
+        Yields:
+            Rendered template chunks.
+        """
+        opts = _make_opts(stringify, escape, missing_data, False)
+        if not isinstance(partials, Partials):
+            partials = Partials(partials)
+        ctx = Ctx([data])
+        return self._iter(ctx, partials, opts)
+
+    def render_to(
+        self,
+        data: dict[str, Any],
+        fp: SupportsWrite,
+        partials: Mapping[str, str] | None = None,
+        *,
+        stringify: Callable[[Any], str] | None = None,
+        escape: Callable[[str], str] | None = None,
+        missing_data: Callable[[], Any] | None = None,
+    ) -> None:
+        """
+        Renders a mustache template into a file-like object.
+
+        Args:
+            data: Values to insert into the template.
+            fp: Text file-like object to write into.
+            partials: Partials to insert into the template.
+
+        Keyword args:
+            stringify: String conversion function.
+            escape: Escaping function.
+            missing_data: Function called on missing data.
+        """
+        write = fp.write
+        for chunk in self.render_iter(
+            data,
+            partials,
+            stringify=stringify,
+            escape=escape,
+            missing_data=missing_data,
+        ):
+            write(chunk)
+
+    async def render_async(
+        self,
+        data: dict[str, Any],
+        partials: Mapping[str, str] | None = None,
+        *,
+        stringify: Callable[[Any], str] | None = None,
+        escape: Callable[[str], str] | None = None,
+        missing_data: Callable[[], Any] | None = None,
+    ) -> str:
+        """
+        Renders a mustache template asynchronously.
+
+        Awaitable values are awaited and sections iterate over
+        async iterables.
+
+        Args:
+            data: Values to insert into the template.
+            partials: Partials to insert into the template.
+
+        Keyword args:
+            stringify: String conversion function.
+            escape: Escaping function.
+            missing_data: Function called on missing data.
+
+        Returns:
+            Rendered template.
+        """
+        return ''.join(
+            [
+                chunk
+                async for chunk in self.render_iter_async(
+                    data,
+                    partials,
+                    stringify=stringify,
+                    escape=escape,
+                    missing_data=missing_data,
+                )
+            ]
+        )
+
+    def render_iter_async(
+        self,
+        data: dict[str, Any],
+        partials: Mapping[str, str] | None = None,
+        *,
+        stringify: Callable[[Any], str] | None = None,
+        escape: Callable[[str], str] | None = None,
+        missing_data: Callable[[], Any] | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Renders a mustache template asynchronously chunk by chunk.
+
+        Awaitable values are awaited and sections iterate over
+        async iterables.
+
+        Args:
+            data: Values to insert into the template.
+            partials: Partials to insert into the template.
+
+        Keyword args:
+            stringify: String conversion function.
+            escape: Escaping function.
+            missing_data: Function called on missing data.
+
+        Yields:
+            Rendered template chunks.
+        """
+        opts = _make_opts(stringify, escape, missing_data, False)
+        if not isinstance(partials, Partials):
+            partials = Partials(partials)
+        ctx = Ctx([data])
+        return self._aiter(ctx, partials, opts)
+
+
+def _make_opts(
+    stringify: Callable[[Any], str] | None,
+    escape: Callable[[str], str] | None,
+    missing_data: Callable[[], Any] | None,
+    compile: bool,
+) -> Opts:
+    return {
+        'stringify': stringify or to_str,
+        'escape': escape or escape_html,
+        'missing_data': missing_data or no_data,
+        'compile': compile,
+    }
+
+
+template_cache: LRUCache[tuple[str, str, str], Template] = LRUCache(256)
+"""
+Process-wide cache of parsed templates used by `render`.
+
+Keyed on template text and delimiters.
+Use `template_cache.resize` to change its size, `template_cache.clear` to
+empty it and `template_cache.info` to get hit/miss/eviction counters.
+"""
+
+lambda_cache: LRUCache[tuple[str, str, str], Template] = LRUCache(256)
+"""
+Process-wide cache of parsed templates returned by lambdas.
+
+Keyed on template text and delimiters like `template_cache`,
+but kept apart so lambdas returning many different templates do not
+evict the templates being rendered. When rendering with `compile=True`,
+templates lambdas return `LAMBDA_COMPILE_AFTER` times are compiled.
+"""
+
+LAMBDA_COMPILE_AFTER = 2
+"""
+Number of renders of a template returned by lambdas after which
+it is compiled.
+"""
+
+
+def get_template(
+    template: str,
+    left_delimiter: str = '{{',
+    right_delimiter: str = '}}',
+) -> Template:
+    """
+    Gets a parsed template from the template cache.
+
+    The template is parsed and stored on a cache miss.
+
+    Args:
+        template: Mustache template.
+        left_delimiter: Left tag delimiter.
+        right_delimiter: Right tag delimiter.
+
+    Returns:
+        Parsed template.
+
+    Raises:
+        DelimiterError: Bad delimiter tag.
+        MissingClosingTagError: Missing closing tag.
+        StrayClosingTagError: Stray closing tag.
+    """
+    return template_cache.get_or_create(
+        (template, left_delimiter, right_delimiter),
+        lambda: Template(template, left_delimiter, right_delimiter),
+    )
+
+
+def _lambda_template(
+    template: str, left_delimiter: str, right_delimiter: str
+) -> Template:
+    return lambda_cache.get_or_create(
+        (template, left_delimiter, right_delimiter),
+        lambda: Template(template, left_delimiter, right_delimiter),
+    )
+
 
 def _render(
     template: str,
     ctx: Ctx,
-    partials: dict[str, str],
+    partials: Partials,
+    opts: Opts,
+    left_delimiter: str = '{{',
+    right_delimiter: str = '}}',
+) -> str:
+    # lambda results are data, so they are not indented
+    root = _lambda_template(template, left_delimiter, right_delimiter)
+    indentation = ctx.indentation
+    ctx.indentation = ''
+    # compiling costs many renders, so only templates lambdas
+    # return again are compiled
+    root._renders += 1
+    if root._renders >= LAMBDA_COMPILE_AFTER:
+        res = root._render(ctx, partials, opts)
+    else:
+        res = root._interpret(ctx, partials, opts)
+    ctx.indentation = indentation
+    return res
+
+
+async def _render_aiter(
+    template: str,
+    ctx: Ctx,
+    partials: Partials,
+    opts: Opts,
+    left_delimiter: str = '{{',
+    right_delimiter: str = '}}',
+) -> AsyncIterator[str]:
+    root = _lambda_template(template, left_delimiter, right_delimiter)
+    indentation = ctx.indentation
+    ctx.indentation = ''
+    async for chunk in root._aiter(ctx, partials, opts):
+        yield chunk
+    ctx.indentation = indentation
+
+
+async def _render_async(
+    template: str,
+    ctx: Ctx,
+    partials: Partials,
     opts: Opts,
     left_delimiter: str = '{{',
     right_delimiter: str = '}}',
 ) -> str:
-    root = Template(template, left_delimiter, right_delimiter)
-    return root._render(ctx, partials, opts)
+    chunks = _render_aiter(
+        template, ctx, partials, opts, left_delimiter, right_delimiter
+    )
+    return ''.join([chunk async for chunk in chunks])
 
 
 def render(
     template: str,
     data: dict[str, Any],
-    partials: dict[str, str] | None = None,
+    partials: Mapping[str, str] | None = None,
     left_delimiter: str = '{{',
     right_delimiter: str = '}}',
     *,
     stringify: Callable[[Any], str] | None = None,
     escape: Callable[[str], str] | None = None,
     missing_data: Callable[[], Any] | None = None,
+    compile: bool = False,
+    profile: 'Profiler | None' = None,
 ) -> str:
     """
     Renders a mustache template.
@@ -236,6 +783,8 @@ def render(
         stringify: String conversion function.
         escape: Escaping function.
         missing_data: Function called on missing data.
+        compile: Compile the template and partials into functions.
+        profile: Profiler recording the parse and the render.
 
     Returns:
         Rendered template.
@@ -245,14 +794,17 @@ def render(
         MissingClosingTagError: Missing closing tag.
         StrayClosingTagError: Stray closing tag.
     """
-    opts: Opts = {
-        'stringify': stringify or to_str,
-        'escape': escape or html.escape,
-        'missing_data': missing_data or (lambda: ''),
-    }
-    if partials is None:
-        partials = {}
-    ctx = Ctx([data])
-    return _render(
-        template, ctx, partials, opts, left_delimiter, right_delimiter
+    if profile is not None:
+        with profile:
+            root = get_template(template, left_delimiter, right_delimiter)
+    else:
+        root = get_template(template, left_delimiter, right_delimiter)
+    return root.render(
+        data,
+        partials,
+        stringify=stringify,
+        escape=escape,
+        missing_data=missing_data,
+        compile=compile,
+        profile=profile,
     )
@@ -2,5 +2,7 @@ from .node import Node
 
 
 class Comment(Node):
+    __slots__ = ()
+
     left = '!'
     ignorable = True
@@ -1,9 +1,11 @@
 from ..exceptions import DelimiterError
-from ..util import find_position
+from ..util import LineIndex, find_position
 from .node import Node
 
 
 class Delimiter(Node):
+    __slots__ = ()
+
     left = '='
     right = '='
     ignorable = True
@@ -18,6 +20,7 @@ class Delimiter(Node):
         template_end: int,
         left_delimiter: str,
         right_delimiter: str,
+        lines: LineIndex | None = None,
     ) -> None:
         super().__init__(
             contents,
@@ -28,6 +31,7 @@ class Delimiter(Node):
             template_end,
             left_delimiter,
             right_delimiter,
+            lines,
         )
         split = self.contents.split()
         if len(split) != 2:
@@ -1,44 +1,34 @@
 import textwrap
+from typing import AsyncIterator, Iterator
 
 from .. import main
 from ..ctx import MISSING, Ctx
-from ..util import Opts, is_whitespace
+from ..partials import Partials
+from ..util import Opts
 from .node import Node
 from .section import Section
 
+# parsed texts kept by every block
+MAX_BLOCK_TEMPLATES = 32
+
 
 def is_paired(node1: Node, node2: Node) -> bool:
     return (
-        is_whitespace(node1.before)
-        and is_whitespace(node2.after)
+        node1.before_is_whitespace
+        and node2.after_is_whitespace
         and node1.tag_end == node2.tag_start
     )
 
 
 class Block(Section):
+    __slots__ = ('_templates', 'indent', 'default_value')
+
     left = '$'
 
-    def __init__(
-        self,
-        contents: str,
-        tag_start: int,
-        tag_end: int,
-        template: str,
-        template_start: int,
-        template_end: int,
-        left_delimiter: str,
-        right_delimiter: str,
-    ) -> None:
-        super().__init__(
-            contents,
-            tag_start,
-            tag_end,
-            template,
-            template_start,
-            template_end,
-            left_delimiter,
-            right_delimiter,
-        )
+    def close(self, closing_tag: Node, inside: 'main.Template') -> None:
+        super().close(closing_tag, inside)
+        # parsed block texts by the default or overriding text
+        self._templates: dict[str, main.Template] = {}
         if is_paired(self, self.closing_tag):
             self.is_standalone = True
             self.actual_start = self.line_start
@@ -66,45 +56,49 @@ class Block(Section):
             self.indent = None
             self.default_value = text
 
-    def handle(self, ctx: Ctx, partials: dict[str, str], opts: Opts) -> str:
-        data = ctx.inheritance_args.get(self.contents, MISSING)
+    def get_template(self, ctx: Ctx) -> 'main.Template':
+        text = ctx.inheritance_args.get(self.contents, MISSING)
+        if text is MISSING:
+            text = self.default_value
 
-        if data is MISSING:
-            partial_template = self.default_value
-        else:
-            partial_template = data
+        # overriding texts come from blocks of the same templates
+        # so there are only a few of them and their hashes are cached
+        try:
+            return self._templates[text]
+        except KeyError:
+            pass
 
+        source = text
         if self.is_standalone:
-            partial_template = textwrap.indent(
-                partial_template, self.indent or self.before
-            )
-        return main._render(partial_template, ctx, partials, opts)
+            source = textwrap.indent(text, self.indent or self.before)
+        if len(self._templates) >= MAX_BLOCK_TEMPLATES:
+            self._templates.clear()
+        template = self._templates[text] = main.get_template(source)
+        return template
+
+    def handle(self, ctx: Ctx, partials: Partials, opts: Opts) -> str:
+        return self.get_template(ctx)._interpret(ctx, partials, opts)
+
+    def iter_handle(
+        self, ctx: Ctx, partials: Partials, opts: Opts
+    ) -> Iterator[str]:
+        yield from self.get_template(ctx)._iter(ctx, partials, opts)
+
+    async def aiter_handle(
+        self, ctx: Ctx, partials: Partials, opts: Opts
+    ) -> AsyncIterator[str]:
+        template = self.get_template(ctx)
+        async for chunk in template._aiter(ctx, partials, opts):
+            yield chunk
 
 
 class Parent(Section):
+    __slots__ = ('blocks',)
+
     left = '<'
 
-    def __init__(
-        self,
-        contents: str,
-        tag_start: int,
-        tag_end: int,
-        template: str,
-        template_start: int,
-        template_end: int,
-        left_delimiter: str,
-        right_delimiter: str,
-    ) -> None:
-        super().__init__(
-            contents,
-            tag_start,
-            tag_end,
-            template,
-            template_start,
-            template_end,
-            left_delimiter,
-            right_delimiter,
-        )
+    def close(self, closing_tag: Node, inside: 'main.Template') -> None:
+        super().close(closing_tag, inside)
         if is_paired(self, self.closing_tag):
             self.is_standalone = True
             self.actual_start = self.line_start
@@ -118,7 +112,6 @@ class Parent(Section):
                 self.is_standalone = True
                 first_block.is_standalone = True
 
-                self.practical_start = self.line_start
                 first_block.actual_end = first_block.line_end
                 first_block.set_indentation_and_default_value()
 
@@ -131,23 +124,54 @@ class Parent(Section):
                 self.closing_tag.actual_end = self.closing_tag.line_end
                 last_block.set_indentation_and_default_value()
 
-    def handle(self, ctx: Ctx, partials: dict[str, str], opts: Opts) -> str:
-        missing_data = opts['missing_data']
-
+    def get_template(
+        self, ctx: Ctx, partials: Partials
+    ) -> 'main.Template | None':
         for block in self.blocks:
             ctx.inheritance_args.setdefault(
                 block.contents, block.default_value
             )
 
-        partial_template = partials.get(self.contents)
+        if self.is_standalone or self.is_pair_standalone:
+            indentation = self.before
+        else:
+            indentation = ''
+        partial_template = partials.get_parent_template(
+            self.contents, indentation
+        )
 
         if partial_template is None:
             ctx.inheritance_args.clear()
-            return missing_data()
+        return partial_template
 
-        if self.is_standalone or self.is_pair_standalone:
-            partial_template = textwrap.indent(partial_template, self.before)
+    def handle(self, ctx: Ctx, partials: Partials, opts: Opts) -> str:
+        partial_template = self.get_template(ctx, partials)
+        if partial_template is None:
+            return opts['missing_data']()
 
-        res = main._render(partial_template, ctx, partials, opts)
+        res = partial_template._interpret(ctx, partials, opts)
         ctx.inheritance_args.clear()
         return res
+
+    def iter_handle(
+        self, ctx: Ctx, partials: Partials, opts: Opts
+    ) -> Iterator[str]:
+        partial_template = self.get_template(ctx, partials)
+        if partial_template is None:
+            yield opts['missing_data']()
+            return
+
+        yield from partial_template._iter(ctx, partials, opts)
+        ctx.inheritance_args.clear()
+
+    async def aiter_handle(
+        self, ctx: Ctx, partials: Partials, opts: Opts
+    ) -> AsyncIterator[str]:
+        partial_template = self.get_template(ctx, partials)
+        if partial_template is None:
+            yield opts['missing_data']()
+            return
+
+        async for chunk in partial_template._aiter(ctx, partials, opts):
+            yield chunk
+        ctx.inheritance_args.clear()
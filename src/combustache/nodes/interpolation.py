@@ -1,12 +1,15 @@
-from typing import Any, Callable
+from typing import Any, AsyncIterator, Callable
 
 from .. import main
 from ..ctx import MISSING, Ctx
-from ..util import LAMBDA, Opts
+from ..partials import Partials
+from ..util import LAMBDA, Opts, escape_html, escape_value, to_str
 from .node import Node
 
 
 class Interpolation(Node):
+    __slots__ = ()
+
     standalonable = False
 
     def get_string(
@@ -15,14 +18,20 @@ class Interpolation(Node):
         stringify: Callable[[Any], str],
         escape: Callable[[str], str],
     ) -> str:
+        if escape is escape_html and stringify is to_str:
+            return escape_value(data)
         return escape(stringify(data))
 
-    def handle(self, ctx: Ctx, partials: dict[str, str], opts: Opts) -> str:
+    def handle(self, ctx: Ctx, partials: Partials, opts: Opts) -> str:
+        return self.handle_data(ctx.get_path(self.path), ctx, partials, opts)
+
+    def handle_data(
+        self, data: Any, ctx: Ctx, partials: Partials, opts: Opts
+    ) -> str:
         stringify = opts['stringify']
         escape = opts['escape']
         missing_data = opts['missing_data']
 
-        data = ctx.get(self.contents)
         if data is MISSING:
             return missing_data()
 
@@ -39,8 +48,28 @@ class Interpolation(Node):
         string = self.get_string(data, stringify, escape)
         return string
 
+    async def aiter_handle(
+        self, ctx: Ctx, partials: Partials, opts: Opts
+    ) -> AsyncIterator[str]:
+        data = await ctx.aget_path(self.path)
+
+        if data is MISSING:
+            yield opts['missing_data']()
+            return
+
+        if callable(data):
+            if data.__name__ == LAMBDA:
+                template = str(await ctx.resolve(data()))
+                data = await main._render_async(template, ctx, partials, opts)
+            else:
+                data = await ctx.resolve(data())
+
+        yield self.get_string(data, opts['stringify'], opts['escape'])
+
 
 class Ampersand(Interpolation):
+    __slots__ = ()
+
     left = '&'
 
     def get_string(
@@ -53,5 +82,7 @@ class Ampersand(Interpolation):
 
 
 class Triple(Ampersand):
+    __slots__ = ()
+
     left = '{'
     right = '}'
@@ -1,12 +1,36 @@
-from ..ctx import Ctx
-from ..util import Opts, is_whitespace
+import sys
+from typing import AsyncIterator, Iterator
+
+from ..ctx import Ctx, key_path
+from ..partials import Partials
+from ..util import LineIndex, Opts
 
 
 class Node:
+    # nodes of cached templates stay in memory for long
+    # so they only keep what parsing sections and rendering use
+    __slots__ = (
+        'contents',
+        'path',
+        'template',
+        'left_delimiter',
+        'right_delimiter',
+        'line_start',
+        'line_end',
+        'tag_start',
+        'tag_end',
+        'before_is_whitespace',
+        'after_is_whitespace',
+        'is_standalone',
+        'actual_start',
+        'actual_end',
+    )
+
     left = ''
     right = ''
     ignorable = False
     standalonable = True
+    is_pair_standalone = False
 
     def __init__(
         self,
@@ -18,33 +42,35 @@ class Node:
         template_end: int,
         left_delimiter: str,
         right_delimiter: str,
+        lines: LineIndex | None = None,
     ) -> None:
-        self.contents = contents
+        # names repeat, equal ones share a string and a key path
+        self.contents = sys.intern(contents)
+        # split once here so rendering does not split on every lookup
+        self.path = key_path(contents)
         self.template = template
-        self.template_start = template_start
-        self.template_end = template_end
         self.left_delimiter = left_delimiter
         self.right_delimiter = right_delimiter
 
-        # we +1 to line_start and line_end to get 'hello\n' instad of '\nhello'
-        # and we get a nice side effect for end of getting 0 if we dont find \n
-        # (i.e. we hit end of string) because str.find returns -1 in that case
-        # so we can 'or len(template)' our value to get the end of the template
-        self.line_start = template.rfind('\n', 0, tag_start) + 1
-        self.line_end = template.find('\n', tag_end) + 1 or len(template)
+        # the parser shares one index between the nodes of a template
+        # so long lines are not searched again for every tag on them
+        if lines is None:
+            lines = LineIndex(template)
+        # line_start is after the last linebreak before the node
+        # and line_end after the first linebreak after it
+        # (or the end of the template)
+        self.line_start, _, first, _ = lines.line(tag_start)
+        _, self.line_end, _, last = lines.line(tag_end)
 
         self.tag_start = tag_start
         self.tag_end = tag_end
 
-        # string between the last linebreak and node start
-        self.before = template[self.line_start : self.tag_start]
-        # string between node end and the next linebreak
-        self.after = template[self.tag_end : self.line_end]
         # these are used to check if the tag is standalone
+        self.before_is_whitespace = first >= tag_start
+        self.after_is_whitespace = last <= tag_end
 
-        self.is_pair_standalone = False
-        self.is_standalone = is_whitespace(self.before) and is_whitespace(
-            self.after
+        self.is_standalone = (
+            self.before_is_whitespace and self.after_is_whitespace
         )
         if self.standalonable and self.is_standalone:
             self.actual_start = self.line_start
@@ -53,6 +79,16 @@ class Node:
             self.actual_start = self.tag_start
             self.actual_end = self.tag_end
 
+    @property
+    def before(self) -> str:
+        # string between the last linebreak and node start
+        return self.template[self.line_start : self.tag_start]
+
+    @property
+    def after(self) -> str:
+        # string between node end and the next linebreak
+        return self.template[self.tag_end : self.line_end]
+
     @property
     def parse_end(self) -> int:
         # parse_end shows the parser from where it should continue parsing
@@ -67,5 +103,18 @@ class Node:
             f'{self.contents} {self.right}{self.right_delimiter}'
         )
 
-    def handle(self, ctx: Ctx, partials: dict[str, str], opts: Opts) -> str:
+    def handle(self, ctx: Ctx, partials: Partials, opts: Opts) -> str:
         raise NotImplementedError
+
+    def iter_handle(
+        self, ctx: Ctx, partials: Partials, opts: Opts
+    ) -> Iterator[str]:
+        # nodes rendering other templates override this to stream them
+        yield self.handle(ctx, partials, opts)
+
+    async def aiter_handle(
+        self, ctx: Ctx, partials: Partials, opts: Opts
+    ) -> AsyncIterator[str]:
+        # nodes looking up data or rendering other templates override this
+        # to await the data and stream the templates
+        yield self.handle(ctx, partials, opts)
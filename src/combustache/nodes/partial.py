@@ -1,28 +1,99 @@
+from typing import AsyncIterator, Iterator
+
 from .. import main
-from ..ctx import Ctx
+from ..ctx import Ctx, KeyPath, key_path
+from ..partials import Partials
 from ..util import Opts
 from .node import Node
 
 
 class Partial(Node):
+    __slots__ = ()
+
     left = '>'
 
-    def handle(self, ctx: Ctx, partials: dict[str, str], opts: Opts) -> str:
-        missing_data = opts['missing_data']
+    @property
+    def dynamic_path(self) -> KeyPath:
+        # {{>*name}} looks the partial name up under the key path of name
+        return key_path(self.contents[1:].strip())
 
+    def get_template(
+        self, ctx: Ctx, partials: Partials
+    ) -> tuple['main.Template | None', str]:
         if self.contents[0] == '*':
-            partial_name = ctx.get(self.contents[1:].strip())
-            partial_template = partials.get(partial_name)
+            partial_name = ctx.get_path(self.dynamic_path)
         else:
-            partial_template = partials.get(self.contents)
+            partial_name = self.contents
+        return self.find_template(partial_name, ctx, partials)
+
+    def find_template(
+        self, partial_name: str, ctx: Ctx, partials: Partials
+    ) -> tuple['main.Template | None', str]:
+        """
+        Finds the partial template and the indentation to render it with.
+
+        Standalone partials are indented while rendering, so a partial
+        is parsed once whatever its indentation is.
+        Partials with inheritance tags are parsed already indented.
+
+        Returns a tuple (template, indentation) where:
+            template: Parsed partial or None if there is no such partial.
+            indentation: Indentation to render the partial with.
+        """
+        if not self.is_standalone:
+            return partials.get_template(partial_name), ''
+
+        indentation = ctx.indentation + self.before
+        partial_template = partials.get_template(partial_name)
+        if (
+            not indentation
+            or partial_template is None
+            or not partial_template._has_inheritance
+        ):
+            return partial_template, indentation
+        return partials.get_template(partial_name, indentation), ''
+
+    def handle(self, ctx: Ctx, partials: Partials, opts: Opts) -> str:
+        partial_template, indentation = self.get_template(ctx, partials)
+        if partial_template is None:
+            return opts['missing_data']()
+
+        outer_indentation = ctx.indentation
+        ctx.indentation = indentation
+        res = partial_template._render(ctx, partials, opts)
+        ctx.indentation = outer_indentation
+        return res
 
+    def iter_handle(
+        self, ctx: Ctx, partials: Partials, opts: Opts
+    ) -> Iterator[str]:
+        partial_template, indentation = self.get_template(ctx, partials)
         if partial_template is None:
-            return missing_data()
+            yield opts['missing_data']()
+            return
 
-        if self.is_standalone:
-            partial_template = '\n'.join(
-                bool(line) * self.before + line
-                for line in partial_template.split('\n')
-            )
+        outer_indentation = ctx.indentation
+        ctx.indentation = indentation
+        yield from partial_template._iter(ctx, partials, opts)
+        ctx.indentation = outer_indentation
+
+    async def aiter_handle(
+        self, ctx: Ctx, partials: Partials, opts: Opts
+    ) -> AsyncIterator[str]:
+        if self.contents[0] == '*':
+            partial_name = await ctx.aget_path(self.dynamic_path)
+        else:
+            partial_name = self.contents
+
+        partial_template, indentation = self.find_template(
+            partial_name, ctx, partials
+        )
+        if partial_template is None:
+            yield opts['missing_data']()
+            return
 
-        return main._render(partial_template, ctx, partials, opts)
+        outer_indentation = ctx.indentation
+        ctx.indentation = indentation
+        async for chunk in partial_template._aiter(ctx, partials, opts):
+            yield chunk
+        ctx.indentation = outer_indentation
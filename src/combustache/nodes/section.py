@@ -1,81 +1,148 @@
+from typing import Any, AsyncIterator, Iterable, Iterator, Mapping
+
 from .. import main
 from ..ctx import MISSING, Ctx
-from ..exceptions import MissingClosingTagError, StrayClosingTagError
-from ..util import LAMBDA, Opts, find_position
+from ..partials import Partials
+from ..util import LAMBDA, Opts, indent_text, line_starts
 from .node import Node
 
+# types never iterated by sections, checked first as they are the most common
+PLAIN_TYPES = frozenset({list, dict, str, int, float, bool, type(None)})
+_NOT_ITEMS = (str, bytes, bytearray, Mapping)
+
+
+class Items:
+    """
+    Non-empty iterable of section items.
+    """
+
+    def __init__(self, iterable: Iterable[Any]) -> None:
+        self.iterable = iterable
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.iterable)
+
+
+class _LazyItems(Items):
+    """
+    Non-empty iterator with its first item already taken.
+
+    Stays truthy after being consumed, iterating it again yields nothing.
+    """
+
+    def __init__(self, first: Any, iterator: Iterator[Any]) -> None:
+        self.first = [first]
+        self.iterator = iterator
+
+    def __iter__(self) -> Iterator[Any]:
+        while self.first:
+            yield self.first.pop()
+        yield from self.iterator
+
+
+def to_items(data: Any, ctx: Ctx) -> Any:
+    """
+    Turns iterable section data into section items.
+
+    Lists, strings, mappings and non-iterables are returned as they are,
+    empty iterables become an empty list and other iterables become
+    `Items` iterated lazily.
+
+    Args:
+        data: Section data.
+        ctx: Context, one-shot iterators are remembered in it.
+
+    Returns:
+        Section data or items.
+    """
+    if (
+        type(data) in PLAIN_TYPES
+        or isinstance(data, _NOT_ITEMS)
+        or isinstance(data, Items)
+        or not isinstance(data, Iterable)
+    ):
+        return data
+
+    iterator = iter(data)
+    if iterator is not data:
+        # collections can be iterated again so only their emptiness
+        # is checked, their truthiness is not used as it can be ambiguous
+        if next(iterator, MISSING) is MISSING:
+            return []
+        return Items(data)
+
+    # iterators can not be checked for emptiness without
+    # taking their first item so the result is kept for the whole render
+    try:
+        return ctx.resolved[id(data)][1]
+    except KeyError:
+        pass
+    first = next(iterator, MISSING)
+    items: Items | list[Any] = (
+        [] if first is MISSING else _LazyItems(first, iterator)
+    )
+    ctx.resolved[id(data)] = (data, items)
+    return items
+
+
+class _AsyncItems:
+    """
+    Non-empty async iterable with its first item already taken.
+
+    Stays truthy after being consumed, iterating it again yields nothing.
+    """
+
+    def __init__(self, first: Any, iterator: AsyncIterator[Any]) -> None:
+        self.first = [first]
+        self.iterator = iterator
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        while self.first:
+            yield self.first.pop()
+        async for item in self.iterator:
+            yield item
+
+
+async def _peek(data: Any, ctx: Ctx) -> Any:
+    # async iterables can not be checked for emptiness without
+    # taking their first item, empty ones become an empty list
+    if not hasattr(data, '__aiter__'):
+        return to_items(data, ctx)
+    try:
+        return ctx.resolved[id(data)][1]
+    except KeyError:
+        pass
+    iterator = aiter(data)
+    try:
+        peeked: _AsyncItems | list[Any] = _AsyncItems(
+            await anext(iterator), iterator
+        )
+    except StopAsyncIteration:
+        peeked = []
+    ctx.resolved[id(data)] = (data, peeked)
+    return peeked
+
 
 class Section(Node):
+    __slots__ = ('closing_tag', 'inside')
+
     left = '#'
 
-    def __init__(
-        self,
-        contents: str,
-        tag_start: int,
-        tag_end: int,
-        template: str,
-        template_start: int,
-        template_end: int,
-        left_delimiter: str,
-        right_delimiter: str,
-    ) -> None:
-        super().__init__(
-            contents,
-            tag_start,
-            tag_end,
-            template,
-            template_start,
-            template_end,
-            left_delimiter,
-            right_delimiter,
-        )
-        depth = 0
-        search_start = self.actual_end
-        while True:
-            node_info = main.find_node(
-                self.template,
-                search_start,
-                self.template_end,
-                self.left_delimiter,
-                self.right_delimiter,
-            )
-            if node_info is None:
-                row, col = find_position(self.template, self.tag_start)
-                raise MissingClosingTagError(
-                    f'No closing tag found: {self.tag_string} at {row}:{col}'
-                )
+    closing_tag: Node
+    inside: 'main.Template'
 
-            NodeType, contents, start, end = node_info
-            if contents == self.contents:
-                if NodeType is self.__class__:
-                    depth += 1
-                elif NodeType is Closing:
-                    if depth == 0:
-                        break
-                    depth -= 1
-
-            search_start = end
-
-        # not creating a ClosingTag because it raises the stray tag error
-        closing_tag = Node(
-            contents,
-            start,
-            end,
-            self.template,
-            self.template_start,
-            self.template_end,
-            self.left_delimiter,
-            self.right_delimiter,
-        )
-        self.closing_tag = closing_tag
+    def close(self, closing_tag: Node, inside: 'main.Template') -> None:
+        """
+        Closes the section with its closing tag.
 
-        self.inside = main.Template(
-            self.template,
-            self.left_delimiter,
-            self.right_delimiter,
-            self.actual_end,
-            self.closing_tag.actual_start,
-        )
+        Called by the parser once the closing tag is found.
+
+        Args:
+            closing_tag: Closing tag of the section.
+            inside: Parsed contents of the section.
+        """
+        self.closing_tag = closing_tag
+        self.inside = inside
 
     @property
     def parse_end(self) -> int:
@@ -85,27 +152,133 @@ class Section(Node):
     def inside_text(self) -> str:
         return self.template[self.actual_end : self.closing_tag.actual_start]
 
+    def get_unprocessed(self, ctx: Ctx) -> str:
+        # lambdas get the text as it is in the source of the partial
+        # so it is indented like the partial is
+        text = self.inside_text
+        if not ctx.indentation:
+            return text
+        closing_tag = self.closing_tag
+        indents = line_starts(
+            text,
+            self.template[self.actual_end - 1] == '\n',
+            not (closing_tag.standalonable and closing_tag.is_standalone),
+        )
+        return indent_text(text, indents, ctx.indentation)
+
     def should_be_rendered(self, item):
         return item and item is not MISSING
 
-    def handle(self, ctx: Ctx, partials: dict[str, str], opts: Opts) -> str:
-        missing_data = opts['missing_data']
+    def handle(self, ctx: Ctx, partials: Partials, opts: Opts) -> str:
+        return self.handle_data(ctx.get_path(self.path), ctx, partials, opts)
 
-        data = ctx.get(self.contents)
+    def handle_data(
+        self, data: Any, ctx: Ctx, partials: Partials, opts: Opts
+    ) -> str:
+        text, items = self.prepare(data, ctx, partials, opts)
+        if items is None:
+            return text
 
+        handled = []
+        for item in items:
+            ctx.append(item)
+            handled.append(self.inside._interpret(ctx, partials, opts))
+            ctx.pop()
+        return ''.join(handled)
+
+    def iter_handle(
+        self, ctx: Ctx, partials: Partials, opts: Opts
+    ) -> Iterator[str]:
+        data = ctx.get_path(self.path)
+        text, items = self.prepare(data, ctx, partials, opts)
+        if items is None:
+            yield text
+            return
+
+        for item in items:
+            ctx.append(item)
+            yield from self.inside._iter(ctx, partials, opts)
+            ctx.pop()
+
+    async def aiter_handle(
+        self, ctx: Ctx, partials: Partials, opts: Opts
+    ) -> AsyncIterator[str]:
+        data = await _peek(await ctx.aget_path(self.path), ctx)
+
+        if not self.should_be_rendered(data):
+            if data is MISSING:
+                yield opts['missing_data']()
+            return
+
+        if callable(data):
+            unprocessed = self.get_unprocessed(ctx)
+            if data.__name__ == LAMBDA:
+                template = str(await ctx.resolve(data(unprocessed)))
+                async for chunk in main._render_aiter(
+                    template,
+                    ctx,
+                    partials,
+                    opts,
+                    self.left_delimiter,
+                    self.right_delimiter,
+                ):
+                    yield chunk
+                return
+            try:
+                data = data(unprocessed)
+            except TypeError:
+                data = data()
+            data = await _peek(await ctx.resolve(data), ctx)
+
+        if isinstance(data, _AsyncItems):
+            async for item in data:
+                async for chunk in self._aiter_inside(
+                    item, ctx, partials, opts
+                ):
+                    yield chunk
+            return
+
+        if not isinstance(data, (list, Items)) or not data:
+            data = [data]
+        for item in data:
+            async for chunk in self._aiter_inside(item, ctx, partials, opts):
+                yield chunk
+
+    async def _aiter_inside(
+        self, item: Any, ctx: Ctx, partials: Partials, opts: Opts
+    ) -> AsyncIterator[str]:
+        ctx.append(await ctx.resolve(item))
+        async for chunk in self.inside._aiter(ctx, partials, opts):
+            yield chunk
+        ctx.pop()
+
+    def prepare(
+        self, data: Any, ctx: Ctx, partials: Partials, opts: Opts
+    ) -> tuple[Any, Iterable[Any] | None]:
+        """
+        Resolves section data into items to render the contents with.
+
+        Returns a tuple (text, items) where:
+            text: Whole section output, used if items is None.
+            items: Context items to render the section contents with.
+        """
+        missing_data = opts['missing_data']
+
+        if type(data) not in PLAIN_TYPES:
+            data = to_items(data, ctx)
         if not self.should_be_rendered(data):
             if data is MISSING:
-                return missing_data()
-            return ''
+                return missing_data(), None
+            return '', None
 
         if callable(data):
-            unprocessed = self.inside_text
+            unprocessed = self.get_unprocessed(ctx)
             # if the callable is a lambda we should call it with the string
             # between the tag and its closing tag and render the result
             # in the current context
             if data.__name__ == LAMBDA:
                 template = str(data(unprocessed))
-                return main._render(
+                text = main._render(
                     template,
                     ctx,
                     partials,
@@ -113,6 +286,7 @@ class Section(Node):
                     self.left_delimiter,
                     self.right_delimiter,
                 )
+                return text, None
             else:
                 # otherwise we should get the result with the string passed in
                 try:
@@ -120,21 +294,18 @@ class Section(Node):
                 # or just called
                 except TypeError:
                     data = data()
+                data = to_items(data, ctx)
 
         # if data is not a list we put it into one
         # so we can process it easily
-        if not isinstance(data, list) or not data:
+        if not isinstance(data, (list, Items)) or not data:
             data = [data]
-
-        handled = []
-        for item in data:
-            ctx.append(item)
-            handled.append(self.inside._render(ctx, partials, opts))
-            ctx.pop()
-        return ''.join(handled)
+        return '', data
 
 
 class Inverted(Section):
+    __slots__ = ()
+
     left = '^'
 
     def should_be_rendered(self, item):
@@ -142,15 +313,7 @@ class Inverted(Section):
 
 
 class Closing(Node):
+    __slots__ = ()
+
     left = '/'
     ignorable = True
-
-    # Section and Inverted find their closing tags themselves
-    # so if the parser tries to create a Closing tag that means that the tag
-    # was not opened to be closed
-    def __init__(self, *args, **kwargs) -> None:
-        super().__init__(*args, **kwargs)
-        row, col = find_position(self.template, self.tag_start)
-        raise StrayClosingTagError(
-            f'Stray closing tag found: {self.tag_string} at {row}:{col}'
-        )
@@ -0,0 +1,159 @@
+import os
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Literal, Mapping
+
+from .ctx import Ctx
+from .main import Template, _make_opts, get_template
+from .partials import Partials
+from .util import Opts
+
+_State = tuple[Template, Partials, Opts]
+
+# template, partials and options of a worker process
+# set once by the pool initializer
+_worker_state: _State | None = None
+
+
+def _init_worker(state: _State) -> None:
+    global _worker_state
+    _worker_state = state
+
+
+def _render_records(state: _State, records: list[Any]) -> list[str]:
+    template, partials, opts = state
+    return [template._render(Ctx([data]), partials, opts) for data in records]
+
+
+def _render_in_worker(records: list[Any]) -> list[str]:
+    assert _worker_state is not None
+    return _render_records(_worker_state, records)
+
+
+def _chunks(records: Iterable[Any], chunksize: int) -> Iterator[list[Any]]:
+    iterator = iter(records)
+    while chunk := list(islice(iterator, chunksize)):
+        yield chunk
+
+
+def render_many(
+    template: str | Template,
+    records: Iterable[Any],
+    partials: Mapping[str, str] | None = None,
+    *,
+    workers: int | None = None,
+    executor: Literal['process', 'thread'] = 'process',
+    chunksize: int = 64,
+    ordered: bool = True,
+    stringify: Callable[[Any], str] | None = None,
+    escape: Callable[[str], str] | None = None,
+    missing_data: Callable[[], Any] | None = None,
+    compile: bool = False,
+) -> Iterator[str]:
+    """
+    Renders a mustache template with many data records in parallel.
+
+    The parsed template and partials are sent to every worker once,
+    the records are sent in chunks.
+    Records are read lazily, only a few chunks per worker are in flight.
+    With the process executor the records, the results and the
+    stringify, escape and missing_data functions have to be picklable.
+
+    Args:
+        template: Mustache template or parsed template.
+        records: Data records to render the template with.
+        partials: Partials to insert into the template.
+
+    Keyword args:
+        workers: Number of workers (defaults to the number of CPUs).
+        executor: Run workers in processes or threads.
+        chunksize: Number of records sent to a worker at a time.
+        ordered: Yield results in the order of records,
+            otherwise in the order chunks finish rendering.
+        stringify: String conversion function.
+        escape: Escaping function.
+        missing_data: Function called on missing data.
+        compile: Compile the template and partials into functions,
+            every worker compiles them once.
+
+    Yields:
+        Rendered templates.
+
+    Raises:
+        ValueError: Bad executor, workers or chunksize.
+        DelimiterError: Bad delimiter tag.
+        MissingClosingTagError: Missing closing tag.
+        StrayClosingTagError: Stray closing tag.
+    """
+    if executor not in ('process', 'thread'):
+        raise ValueError(f'Unknown executor: {executor!r}')
+    if chunksize < 1:
+        raise ValueError(f'Chunk size has to be positive: {chunksize}')
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f'Number of workers has to be positive: {workers}')
+
+    if not isinstance(template, Template):
+        template = get_template(template)
+    if not isinstance(partials, Partials):
+        partials = Partials(partials)
+    opts = _make_opts(stringify, escape, missing_data, compile)
+    state = (template, partials, opts)
+
+    return _results(
+        state, _chunks(records, chunksize), workers, executor, ordered
+    )
+
+
+def _results(
+    state: _State,
+    chunks: Iterator[list[Any]],
+    workers: int,
+    executor: str,
+    ordered: bool,
+) -> Iterator[str]:
+    pool: Executor
+    if executor == 'process':
+        pool = ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(state,)
+        )
+        render_chunk = _render_in_worker
+    else:
+        pool = ThreadPoolExecutor(workers)
+        render_chunk = partial(_render_records, state)
+
+    # a few chunks per worker are kept in flight
+    # so the records are not all read into memory at once
+    max_pending = 2 * workers
+    try:
+        if ordered:
+            queue: deque[Future[list[str]]] = deque()
+            for chunk in chunks:
+                queue.append(pool.submit(render_chunk, chunk))
+                if len(queue) >= max_pending:
+                    yield from queue.popleft().result()
+            while queue:
+                yield from queue.popleft().result()
+        else:
+            pending: set[Future[list[str]]] = set()
+            for chunk in chunks:
+                pending.add(pool.submit(render_chunk, chunk))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+            for future in as_completed(pending):
+                yield from future.result()
+    finally:
+        pool.shutdown(cancel_futures=True)
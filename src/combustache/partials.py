@@ -0,0 +1,120 @@
+import textwrap
+from typing import TYPE_CHECKING, Iterator, Mapping
+
+from . import main
+from .util import indent_lines
+
+if TYPE_CHECKING:
+    from .diskcache import DiskCache
+
+
+class Partials(Mapping[str, str]):
+    """
+    Partial templates.
+
+    Every partial is parsed once and the parsed template is reused
+    across renders until its source in the underlying mapping changes.
+    Standalone partials are indented while rendering, only partials
+    with inheritance tags are parsed once per distinct indentation.
+    Accepted wherever a partials dictionary is.
+    """
+
+    def __init__(
+        self,
+        partials: Mapping[str, str] | None = None,
+        *,
+        disk_cache: 'DiskCache | None' = None,
+    ) -> None:
+        """
+        Initializes partial templates.
+
+        Args:
+            partials: Partial sources by name.
+
+        Keyword args:
+            disk_cache: Persistent cache to load parsed partials from.
+        """
+        if partials is None:
+            partials = {}
+        self._sources = partials
+        self._disk_cache = disk_cache
+        # parsed templates with the source they were parsed from
+        self._templates: dict[
+            tuple[str, str, bool], tuple[str, main.Template]
+        ] = {}
+
+    def __getitem__(self, name: str) -> str:
+        return self._sources[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._sources)
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    def get_template(
+        self, name: str, indentation: str = ''
+    ) -> 'main.Template | None':
+        """
+        Gets a parsed partial template.
+
+        Args:
+            name: Partial name.
+            indentation: Indentation of every non-empty partial line.
+
+        Returns:
+            Parsed partial or None if there is no such partial.
+
+        Raises:
+            DelimiterError: Bad delimiter tag.
+            MissingClosingTagError: Missing closing tag.
+            StrayClosingTagError: Stray closing tag.
+        """
+        return self._get(name, indentation, False)
+
+    def get_parent_template(
+        self, name: str, indentation: str = ''
+    ) -> 'main.Template | None':
+        """
+        Gets a parsed parent template.
+
+        Unlike partials, whitespace-only lines of parents are not indented.
+
+        Args:
+            name: Partial name.
+            indentation: Indentation of every non-blank partial line.
+
+        Returns:
+            Parsed partial or None if there is no such partial.
+
+        Raises:
+            DelimiterError: Bad delimiter tag.
+            MissingClosingTagError: Missing closing tag.
+            StrayClosingTagError: Stray closing tag.
+        """
+        return self._get(name, indentation, True)
+
+    def _get(
+        self, name: str, indentation: str, parent: bool
+    ) -> 'main.Template | None':
+        source = self._sources.get(name)
+        if source is None:
+            return None
+
+        key = (name, indentation, parent)
+        cached = self._templates.get(key)
+        if cached is not None and cached[0] is source:
+            return cached[1]
+
+        if not indentation:
+            text = source
+        elif parent:
+            text = textwrap.indent(source, indentation)
+        else:
+            text = indent_lines(source, indentation)
+        if self._disk_cache is not None:
+            template = self._disk_cache.get_template(text)
+        else:
+            template = main.get_template(text)
+        self._templates[key] = (source, template)
+        return template
@@ -0,0 +1,224 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable
+
+from . import main
+from .ctx import Ctx
+from .nodes import Node
+from .partials import Partials
+from .util import Opts, SupportsWrite, find_position
+
+_local = threading.local()
+_lock = threading.Lock()
+_active = 0
+_originals: dict[str, Any] = {}
+
+
+def _profiled_parse(*args: Any) -> list[Node | str]:
+    profiler: Profiler | None = getattr(_local, 'profiler', None)
+    if profiler is None:
+        return _originals['parse'](*args)
+    return profiler._time('parse', _originals['parse'], *args)
+
+
+def _profiled_render(
+    template: 'main.Template', ctx: Ctx, partials: Partials, opts: Opts
+) -> str:
+    profiler: Profiler | None = getattr(_local, 'profiler', None)
+    if profiler is None:
+        return _originals['render'](template, ctx, partials, opts)
+    # compiled templates inline their nodes, so they are interpreted
+    if not profiler._stack:
+        return profiler._time(
+            'render', profiler._interpret, template, ctx, partials, opts
+        )
+    return profiler._interpret(template, ctx, partials, opts)
+
+
+def _profiled_interpret(
+    template: 'main.Template', ctx: Ctx, partials: Partials, opts: Opts
+) -> str:
+    profiler: Profiler | None = getattr(_local, 'profiler', None)
+    if profiler is None:
+        return _originals['interpret'](template, ctx, partials, opts)
+    return profiler._interpret(template, ctx, partials, opts)
+
+
+def _install() -> None:
+    # the hooks are only in place while a profiler is active
+    # so rendering without one has no overhead
+    global _active
+    with _lock:
+        if not _active:
+            _originals['parse'] = main.parse
+            _originals['render'] = main.Template._render
+            _originals['interpret'] = main.Template._interpret
+            main.parse = _profiled_parse  # type: ignore[assignment]
+            main.Template._render = _profiled_render  # type: ignore[method-assign,assignment]
+            main.Template._interpret = _profiled_interpret  # type: ignore[method-assign,assignment]
+        _active += 1
+
+
+def _uninstall() -> None:
+    global _active
+    with _lock:
+        _active -= 1
+        if not _active:
+            main.parse = _originals['parse']
+            main.Template._render = _originals['render']  # type: ignore[method-assign]
+            main.Template._interpret = _originals['interpret']  # type: ignore[method-assign]
+
+
+class NodeStats:
+    """
+    Timings of a node.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.cumulative = 0.0
+        self.own = 0.0
+
+
+class Profiler:
+    """
+    Render profiler.
+
+    Records parse and render time, call counts, cumulative and own time
+    of every node keyed by its tag and row:col in its template.
+    Compiled templates are interpreted while profiling.
+    Only renders in the thread that entered the profiler are recorded.
+
+    Example::
+
+        >>> profiler = Profiler()
+        >>> with profiler:
+        ...     render(template, data, partials)
+        >>> print(profiler.report())
+        >>> with open('out.folded', 'w') as f:
+        ...     profiler.dump_collapsed(f)
+    """
+
+    def __init__(self) -> None:
+        self.stats: defaultdict[str, NodeStats] = defaultdict(NodeStats)
+        # parse time includes partials and lambda results parsed
+        # while rendering, render time excludes it
+        self.parse_time = 0.0
+        self.render_time = 0.0
+        self._parse_in_render = 0.0
+        # own time by stack of frames
+        self.collapsed: defaultdict[tuple[str, ...], float] = defaultdict(
+            float
+        )
+        self._stack: list[str] = []
+        # time spent in children of the frames on the stack
+        self._children: list[float] = []
+        self._labels: dict[Node, str] = {}
+        self._previous: Profiler | None = None
+
+    def __enter__(self) -> 'Profiler':
+        _install()
+        self._previous = getattr(_local, 'profiler', None)
+        _local.profiler = self
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        _local.profiler = self._previous
+        self._previous = None
+        _uninstall()
+
+    def _label(self, node: Node) -> str:
+        try:
+            return self._labels[node]
+        except KeyError:
+            pass
+        row, col = find_position(node.template, node.tag_start)
+        tag = node.tag_string.replace(';', ',').replace('\n', ' ')
+        label = self._labels[node] = f'{tag} {row}:{col}'
+        return label
+
+    def _time(self, frame: str, func: Callable[..., Any], *args: Any) -> Any:
+        self._stack.append(frame)
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            own = elapsed - self._children.pop()
+            self.collapsed[tuple(self._stack)] += own
+            self._stack.pop()
+            if self._children:
+                self._children[-1] += elapsed
+            stats = self.stats[frame]
+            stats.calls += 1
+            stats.cumulative += elapsed
+            stats.own += own
+            if frame == 'parse':
+                self.parse_time += elapsed
+                if self._stack:
+                    self._parse_in_render += elapsed
+            elif frame == 'render':
+                self.render_time += elapsed - self._parse_in_render
+                self._parse_in_render = 0.0
+
+    def _interpret(
+        self,
+        template: 'main.Template',
+        ctx: Ctx,
+        partials: Partials,
+        opts: Opts,
+    ) -> str:
+        time_node = self._time
+        label = self._label
+        indentation = ctx.indentation
+        return ''.join(
+            time_node(label(node), node.handle, ctx, partials, opts)
+            if isinstance(node, Node)
+            else main._indent(node, indentation)
+            for node in template._list
+        )
+
+    def report(
+        self, sort: str = 'cumulative', limit: int | None = None
+    ) -> str:
+        """
+        Makes a report of the node timings.
+
+        Args:
+            sort: Column to sort by ('cumulative', 'own' or 'calls').
+            limit: Maximum number of nodes.
+
+        Returns:
+            Report table.
+        """
+        rows = sorted(
+            self.stats.items(),
+            key=lambda item: getattr(item[1], sort),
+            reverse=True,
+        )[:limit]
+        lines = [
+            f'parse: {self.parse_time * 1e3:.3f} ms,'
+            f' render: {self.render_time * 1e3:.3f} ms',
+            f'{"calls":>8} {"cumulative ms":>14} {"own ms":>10}  node',
+        ]
+        for label, stats in rows:
+            lines.append(
+                f'{stats.calls:>8} {stats.cumulative * 1e3:>14.3f}'
+                f' {stats.own * 1e3:>10.3f}  {label}'
+            )
+        return '\n'.join(lines)
+
+    def dump_collapsed(self, fp: SupportsWrite) -> None:
+        """
+        Writes the timings in the collapsed stack format of flamegraphs.
+
+        Every line is a semicolon separated stack of frames
+        followed by its own time in microseconds.
+
+        Args:
+            fp: Text file-like object to write into.
+        """
+        for stack, own in self.collapsed.items():
+            fp.write(f'{";".join(stack)} {round(own * 1e6)}\n')
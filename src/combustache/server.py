@@ -0,0 +1,173 @@
+"""
+Render server keeping parsed and compiled templates resident.
+
+Requests and responses are json lines, so any json capable client
+can talk to it: ::
+
+    > {"template": "index", "data": {"username": "world"}}
+    < {"output": "<h1> Welcome, world! </h1>"}
+    > {"template": "nope"}
+    < {"error": "KeyError: 'nope'"}
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+from typing import Any, Iterable
+
+from .directory import TemplateDirectory
+from .exceptions import ServerError
+from .util import StrPath, SupportsWrite
+
+
+def render_request(
+    templates: TemplateDirectory, line: str, lock: threading.Lock
+) -> str:
+    """
+    Renders a json request line.
+
+    Args:
+        templates: Templates to render.
+        line: Json object with the template name and optional data.
+        lock: Lock held while reloading templates.
+
+    Returns:
+        Json response line without the line break.
+    """
+    try:
+        request = json.loads(line)
+        name = request['template']
+        with lock:
+            template = templates.get_template(name)
+        if template is None:
+            raise KeyError(name)
+        output = template.render(
+            request.get('data', {}), templates.partials, compile=True
+        )
+    except Exception as e:
+        # a bad request does not stop the server
+        return json.dumps({'error': f'{type(e).__name__}: {e}'})
+    return json.dumps({'output': output})
+
+
+def serve_lines(
+    templates: TemplateDirectory,
+    lines: Iterable[str],
+    output: SupportsWrite,
+) -> None:
+    """
+    Answers json request lines until they run out.
+
+    Args:
+        templates: Templates to render.
+        lines: Request lines (e.g. stdin).
+        output: Text file-like object responses are written to.
+    """
+    lock = threading.Lock()
+    flush = getattr(output, 'flush', None)
+    for line in lines:
+        if not line.strip():
+            continue
+        output.write(render_request(templates, line, lock) + '\n')
+        if flush is not None:
+            flush()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: 'RenderServer'
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = render_request(
+                self.server.templates, line.decode(), self.server.lock
+            )
+            self.wfile.write(response.encode() + b'\n')
+
+
+class RenderServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Unix socket render server, every connection is served by a thread.
+
+    Example::
+
+        >>> templates = TemplateDirectory('./templates/', '.mustache')
+        >>> with RenderServer('/tmp/combustache.sock', templates) as server:
+        ...     server.serve_forever()
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: StrPath, templates: TemplateDirectory) -> None:
+        """
+        Binds a render server to a socket path.
+
+        A socket file left by a stopped server is replaced.
+
+        Args:
+            path: Socket path.
+            templates: Templates to render.
+
+        Raises:
+            OSError: A server is already listening on the path.
+        """
+        path = os.fspath(path)
+        if os.path.exists(path):
+            try:
+                with socket.socket(socket.AF_UNIX) as sock:
+                    sock.connect(path)
+            except OSError:
+                os.unlink(path)
+            else:
+                raise OSError(f'A server is already listening on {path}')
+        self.templates = templates
+        self.lock = threading.Lock()
+        super().__init__(path, _Handler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.server_address)  # type: ignore
+        except FileNotFoundError:
+            pass
+
+
+def request(
+    path: StrPath,
+    template: str,
+    data: Any,
+    timeout: float | None = None,
+) -> str:
+    """
+    Renders a template on a render server.
+
+    Args:
+        path: Socket path of the server.
+        template: Template name.
+        data: Json serializable values to insert into the template.
+        timeout: Seconds to wait for the server (None to wait forever).
+
+    Returns:
+        Rendered template.
+
+    Raises:
+        ServerError: The server could not render the template.
+        OSError: The server could not be reached.
+    """
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.settimeout(timeout)
+        sock.connect(os.fspath(path))
+        sock.sendall(
+            json.dumps({'template': template, 'data': data}).encode() + b'\n'
+        )
+        with sock.makefile('rb') as f:
+            line = f.readline()
+    if not line:
+        raise ServerError('The server closed the connection')
+    response = json.loads(line)
+    if 'error' in response:
+        raise ServerError(response['error'])
+    return response['output']
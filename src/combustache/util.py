@@ -1,12 +1,168 @@
+from functools import cached_property, partial
 from os import PathLike
 from pathlib import Path
-from typing import Any, Callable, TypedDict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterator,
+    Mapping,
+    Protocol,
+    TypedDict,
+    overload,
+)
+
+if TYPE_CHECKING:
+    from .partials import Partials
 
 StrPath = PathLike[str] | str
 
 LAMBDA = '<lambda>'
 
 
+class SupportsWrite(Protocol):
+    """
+    Text file-like object.
+    """
+
+    def write(self, string: str, /) -> Any: ...
+
+
+class SupportsRead(Protocol):
+    """
+    Readable text file-like object.
+    """
+
+    def read(self, size: int = -1, /) -> str: ...
+
+
+class Text(str):
+    """
+    Template text knowing where its source lines start.
+
+    The text of a partial rendered as a standalone partial gets
+    its indentation inserted at these offsets.
+    """
+
+    # whether the text starts a line and whether the line
+    # starting at its end is indented
+    line_start: bool
+    include_end: bool
+
+    @cached_property
+    def indents(self) -> tuple[int, ...]:
+        # found on first use, most text is never indented
+        return line_starts(self, self.line_start, self.include_end)
+
+
+def indent_text(text: str, indents: tuple[int, ...], indentation: str) -> str:
+    """
+    Inserts indentation into text.
+
+    Args:
+        text: Text.
+        indents: Offsets to insert the indentation at.
+        indentation: Indentation.
+
+    Returns:
+        Indented text.
+    """
+    pieces = []
+    prev = 0
+    for offset in indents:
+        pieces.append(text[prev:offset])
+        prev = offset
+    pieces.append(text[prev:])
+    return indentation.join(pieces)
+
+
+def line_starts(
+    text: str, line_start: bool, include_end: bool
+) -> tuple[int, ...]:
+    """
+    Finds offsets of non-empty line starts in a part of a template.
+
+    These are the places `indent_lines` would indent if it was applied
+    to the whole template.
+
+    Args:
+        text: Part of a template.
+        line_start: The part starts a line.
+        include_end: Count a line starting at the end of the part.
+
+    Returns:
+        Line start offsets.
+    """
+    pos = 0 if line_start else text.find('\n') + 1
+    if not pos and not line_start:
+        return ()
+
+    offsets = []
+    end = len(text)
+    while pos < end:
+        if text[pos] != '\n':
+            offsets.append(pos)
+        pos = text.find('\n', pos) + 1
+        if not pos:
+            return tuple(offsets)
+    if include_end:
+        offsets.append(end)
+    return tuple(offsets)
+
+
+class LineIndex:
+    """
+    Line bounds of a template found as the template is scanned.
+
+    Every line is searched for and measured once, starting from the end
+    of the last found line, so finding the lines of tags in order
+    takes time linear in the template length however long its lines are.
+    """
+
+    def __init__(self, template: str) -> None:
+        """
+        Initializes a line index.
+
+        Args:
+            template: Mustache template.
+        """
+        self.template = template
+        # bounds of the last found line, the end is after its line break
+        self._start = 0
+        self._end = 0
+        # offsets of its first non-whitespace character
+        # and of the end of its last non-whitespace character
+        self._first = 0
+        self._last = 0
+
+    def line(self, pos: int) -> tuple[int, int, int, int]:
+        """
+        Finds the line of a template index.
+
+        Returns a tuple (start, end, first, last) where:
+            start: Index where the line starts.
+            end: Index after the line break ending the line.
+            first: Index of the first non-whitespace character
+                or end if there is none.
+            last: Index after the last non-whitespace character
+                or start if there is none.
+        """
+        template = self.template
+        if not (
+            self._start <= pos
+            and (pos < self._end or self._end == len(template))
+        ):
+            low = self._end if pos >= self._end else 0
+            start = template.rfind('\n', low, pos) + 1 or low
+            end = template.find('\n', pos) + 1 or len(template)
+            line = template[start:end]
+            self._start = start
+            self._end = end
+            self._first = end - len(line.lstrip())
+            self._last = start + len(line.rstrip())
+        return self._start, self._end, self._first, self._last
+
+
 class Opts(TypedDict):
     """
     `render` and `Template.render` options.
@@ -15,6 +171,7 @@ class Opts(TypedDict):
     stringify: Callable[[Any], str]
     escape: Callable[[str], str]
     missing_data: Callable[[], Any]
+    compile: bool
 
 
 def is_whitespace(string: str) -> bool:
@@ -31,17 +188,154 @@ def to_str(val: Any) -> str:
     """
     Turns a value into a string with None -> ''.
 
+    Values with an `__html__` method become a `SafeString` of its result.
+
     Args:
         val: Value to stringify.
 
     Returns:
         Stringified value.
     """
+    cls = val.__class__
+    if cls is str:
+        return val
     if val is None:
         return ''
+    if cls is not int and cls is not float and cls is not bool:
+        to_html = getattr(val, '__html__', None)
+        if to_html is not None:
+            return SafeString(to_html())
     return str(val)
 
 
+class SafeString(str):
+    """
+    String not escaped by `escape_html`.
+
+    Values with an `__html__` method, like `markupsafe.Markup`,
+    are turned into safe strings by `to_str`, so already escaped markup
+    is not escaped twice.
+
+    Example::
+
+        >>> render('{{a}} {{b}}', {'a': '<b>', 'b': SafeString('<b>')})
+        '&lt;b&gt; <b>'
+    """
+
+    __slots__ = ()
+
+    def __html__(self) -> 'SafeString':
+        return self
+
+
+def escape_html(string: str) -> str:
+    """
+    Escapes HTML special characters like `html.escape`.
+
+    Strings without special characters are returned as they are
+    and strings with an `__html__` method are not escaped.
+
+    Args:
+        string: String to escape.
+
+    Returns:
+        Escaped string.
+    """
+    if string.__class__ is not str and hasattr(string, '__html__'):
+        return string
+    # a few substring checks are cheaper than five replaces
+    if (
+        '&' in string
+        or '<' in string
+        or '>' in string
+        or '"' in string
+        or "'" in string
+    ):
+        return (
+            string.replace('&', '&amp;')
+            .replace('<', '&lt;')
+            .replace('>', '&gt;')
+            .replace('"', '&quot;')
+            .replace("'", '&#x27;')
+        )
+    return string
+
+
+def escape_value(value: Any) -> str:
+    """
+    Stringifies and escapes a value, same as `escape_html(to_str(value))`.
+
+    Used instead of them when rendering with both as options.
+    Numbers and booleans are not escaped as they can not contain
+    special characters.
+
+    Args:
+        value: Value to stringify and escape.
+
+    Returns:
+        Escaped string.
+    """
+    cls = value.__class__
+    if cls is str:
+        return escape_html(value)
+    if cls is int or cls is float or cls is bool:
+        return str(value)
+    return escape_html(to_str(value))
+
+
+def _escape_html_cached(
+    escaped: dict[str, str], maxsize: int, max_length: int, string: str
+) -> str:
+    # safe strings are equal to plain ones, so only plain ones are kept
+    if string.__class__ is not str:
+        return escape_html(string)
+    try:
+        return escaped[string]
+    except KeyError:
+        pass
+    result = escape_html(string)
+    if len(string) <= max_length:
+        if len(escaped) >= maxsize:
+            escaped.clear()
+        escaped[string] = result
+    return result
+
+
+def cached_escape_html(
+    maxsize: int = 4096, max_length: int = 64
+) -> Callable[[str], str]:
+    """
+    Makes an `escape_html` remembering the escapes of short strings.
+
+    Pays off when the data repeats the same short strings,
+    like names, statuses or categories in a big table.
+    The remembered strings are forgotten all at once when there are
+    maxsize of them. The function can be pickled for `render_many`.
+
+    Example::
+
+        >>> render(template, data, escape=cached_escape_html())
+
+    Args:
+        maxsize: Maximum number of remembered strings.
+        max_length: Maximum length of remembered strings.
+
+    Returns:
+        Escaping function.
+    """
+    return partial(_escape_html_cached, {}, maxsize, max_length)
+
+
+def no_data() -> str:
+    """
+    Default function called on missing data.
+
+    Returns:
+        Empty string.
+    """
+    return ''
+
+
 def find_position(template: str, index: int) -> tuple[int, int]:
     """
     Finds row and column of an index in a template.
@@ -64,28 +358,123 @@ def find_template_files(path: Path, extension: str) -> list[Path]:
     return list(path.rglob(f'**/*{extension}'))
 
 
+def template_name(
+    path: Path, extension: str, include_relative_path: bool, relative_to: Path
+) -> str:
+    if include_relative_path:
+        return '.'.join(path.relative_to(relative_to).parts).removesuffix(
+            extension
+        )
+    return path.name.removesuffix(extension)
+
+
 def paths_to_templates(
     partial_paths: list[Path],
     extension: str,
     include_relative_path: bool,
     relative_to: Path,
 ) -> dict[str, str]:
-    if include_relative_path:
-        return {
-            '.'.join(path.relative_to(relative_to).parts).removesuffix(
-                extension
-            ): path.read_text()
-            for path in partial_paths
-        }
     return {
-        path.name.removesuffix(extension): path.read_text()
+        template_name(
+            path, extension, include_relative_path, relative_to
+        ): path.read_text()
         for path in partial_paths
     }
 
 
+class TemplateLoader(Mapping[str, str]):
+    """
+    Templates of a directory read on first access.
+
+    File names are indexed up front, a file is read the first time
+    its template is looked up and kept afterwards,
+    so memory grows with the templates actually used.
+    Wrap it in `Partials` to also parse templates on first use.
+
+    Example::
+
+        >>> loader = TemplateLoader('./templates/', '.mustache')
+        >>> list(loader)
+        ['comment', 'index']
+        >>> loader['index']
+        '<h1> Welcome, {{username}}! </h1>'
+    """
+
+    def __init__(
+        self,
+        path: StrPath,
+        extension: str,
+        *,
+        include_relative_path: bool = False,
+    ) -> None:
+        """
+        Indexes templates of a directory.
+
+        Args:
+            path: Root directory path.
+            extension: Template file extension.
+
+        Keyword args:
+            include_relative_path: Include template's relative path
+                in its name.
+        """
+        path = Path(path)
+        self._paths = {
+            template_name(p, extension, include_relative_path, path): p
+            for p in find_template_files(path, extension)
+        }
+        self._templates: dict[str, str] = {}
+
+    def __getitem__(self, name: str) -> str:
+        try:
+            return self._templates[name]
+        except KeyError:
+            pass
+        try:
+            template = self._paths[name].read_text()
+        except FileNotFoundError:
+            # deleted after indexing
+            raise KeyError(name) from None
+        self._templates[name] = template
+        return template
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+
+@overload
 def load_templates(
-    path: StrPath, extension: str, *, include_relative_path: bool = False
-) -> dict[str, str]:
+    path: StrPath,
+    extension: str,
+    *,
+    include_relative_path: bool = False,
+    cache_dir: None = None,
+) -> dict[str, str]: ...
+
+
+@overload
+def load_templates(
+    path: StrPath,
+    extension: str,
+    *,
+    include_relative_path: bool = False,
+    cache_dir: StrPath,
+) -> 'Partials': ...
+
+
+def load_templates(
+    path: StrPath,
+    extension: str,
+    *,
+    include_relative_path: bool = False,
+    cache_dir: StrPath | None = None,
+) -> 'dict[str, str] | Partials':
     """
     Loads templates from a directory.
 
@@ -114,12 +503,41 @@ def load_templates(
         path: Root directory path.
         extension: Template file extension.
         include_relative_path: Include template's relative path in its name.
+        cache_dir: Directory of a `DiskCache` to load parsed and compiled
+            templates from.
+
+    Returns:
+        Dictionary of templates, or if cache_dir is given
+        `Partials` reading and parsing templates on first use.
+    """
+    if cache_dir is None:
+        path = Path(path)
+        partial_paths = find_template_files(path, extension)
+        return paths_to_templates(
+            partial_paths, extension, include_relative_path, path
+        )
+
+    # imported here as both depend on this module
+    from .diskcache import DiskCache
+    from .partials import Partials
+
+    loader = TemplateLoader(
+        path, extension, include_relative_path=include_relative_path
+    )
+    return Partials(loader, disk_cache=DiskCache(cache_dir))
+
+
+def indent_lines(string: str, indentation: str) -> str:
+    """
+    Prefixes every non-empty line of a string with indentation.
+
+    Args:
+        string: String to indent.
+        indentation: Indentation prefix.
 
     Returns:
-        Dictionary of templates.
+        Indented string.
     """
-    path = Path(path)
-    partial_paths = find_template_files(path, extension)
-    return paths_to_templates(
-        partial_paths, extension, include_relative_path, path
+    return '\n'.join(
+        bool(line) * indentation + line for line in string.split('\n')
     )
@@ -11,7 +11,8 @@ def lambda_constructor(
     loader: yaml.Loader | yaml.FullLoader | yaml.UnsafeLoader, node: yaml.Node
 ) -> Any:
     value = loader.construct_mapping(node)  # type: ignore
-    return eval(value['python'])
+    # fresh globals so stateful lambdas do not share state between runs
+    return eval(value['python'], {})
 
 
 yaml.add_constructor('!code', lambda_constructor)
@@ -24,23 +25,29 @@ def pytest_collect_file(parent, file_path: Path):
 
 class SpecFile(pytest.File):
     def collect(self):
-        with self.path.open() as f:
-            r = yaml.load(f, yaml.Loader)
-        for test in r['tests']:
-            yield SpecItem.from_parent(self, name=test['name'], test=test)
+        # every test is run interpreted and compiled
+        for compile in (False, True):
+            with self.path.open() as f:
+                r = yaml.load(f, yaml.Loader)
+            for test in r['tests']:
+                name = test['name'] + (' (compiled)' if compile else '')
+                yield SpecItem.from_parent(
+                    self, name=name, test=test, compile=compile
+                )
 
 
 class SpecItem(pytest.Item):
-    def __init__(self, *, test: dict, **kwargs):
+    def __init__(self, *, test: dict, compile: bool, **kwargs):
         super().__init__(**kwargs)
         self.test = test
+        self.compile = compile
 
     def runtest(self) -> None:
         template = self.test['template']
         expected = self.test['expected']
         data = self.test['data']
         partials = self.test.get('partials', None)
-        result = render(template, data, partials)
+        result = render(template, data, partials, compile=self.compile)
         if result != expected:
             raise TestException(
                 self, template, expected, data, partials, result
@@ -0,0 +1,79 @@
+import asyncio
+
+import combustache
+
+
+async def value(result):
+    await asyncio.sleep(0)
+    return result
+
+
+async def rows(*items):
+    for item in items:
+        await asyncio.sleep(0)
+        yield item
+
+
+def render_async(template, data, partials=None):
+    template = combustache.Template(template)
+    return asyncio.run(template.render_async(data, partials))
+
+
+def test_awaits_values():
+    data = {'name': value('<world>'), 'user': value({'id': value(7)})}
+    template = 'Hello {{name}} {{{name}}} #{{user.id}}'
+
+    assert render_async(template, data) == 'Hello &lt;world&gt; <world> #7'
+
+
+def test_awaits_callables():
+    async def greeting():
+        return 'hi'
+
+    template = '{{greeting}} {{#greeting}}[{{.}}]{{/greeting}}'
+    assert render_async(template, {'greeting': greeting}) == 'hi [hi]'
+
+
+def test_sections_iterate_async_iterables():
+    data = {'rows': rows(1, value(2), 3)}
+    template = '{{#rows}}({{.}}){{/rows}}{{^rows}}none{{/rows}}'
+
+    assert render_async(template, data) == '(1)(2)(3)'
+
+
+def test_empty_async_iterable():
+    template = '{{#rows}}({{.}}){{/rows}}{{^rows}}none{{/rows}}'
+    assert render_async(template, {'rows': rows()}) == 'none'
+
+
+def test_partials_and_inheritance():
+    data = {'name': value('x'), 'which': value('row')}
+    partials = {'row': '<{{name}}>', 'layout': '[{{$b}}{{/b}}]'}
+    template = '{{>*which}}{{<layout}}{{$b}}{{name}}{{/b}}{{/layout}}'
+
+    assert render_async(template, data, partials) == '<x>[x]'
+
+
+def test_render_iter_async_streams():
+    template = combustache.Template('{{#rows}}{{.}}{{/rows}}')
+
+    async def collect():
+        iterator = template.render_iter_async({'rows': rows(1, 2, 3)})
+        return [chunk async for chunk in iterator]
+
+    assert asyncio.run(collect()) == ['1', '2', '3']
+
+
+def test_matches_sync_render():
+    template = combustache.Template(
+        '{{#a}}{{b}}{{/a}}{{^c}}{{d.e}}{{/c}}{{>p}}{{lambda}}'
+    )
+    data = {
+        'a': [{'b': 1}, {'b': 2}],
+        'd': {'e': '&'},
+        'lambda': lambda: '{{d.e}}',
+    }
+    partials = {'p': '  {{#a}}-{{/a}}\n'}
+
+    result = asyncio.run(template.render_async(data, partials))
+    assert result == template.render(data, partials)
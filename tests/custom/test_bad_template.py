@@ -39,3 +39,36 @@ def test_stray_closing_tag():
 
     with pytest.raises(combustache.StrayClosingTagError):
         combustache.render(template, data)
+
+
+def test_error_positions():
+    with pytest.raises(
+        combustache.MissingClosingTagError, match='{{# b }} at 2:3'
+    ):
+        combustache.render('{{#a}}\n  {{#b}}{{/a}}', {})
+
+    with pytest.raises(
+        combustache.StrayClosingTagError, match='{{/ b }} at 1:7'
+    ):
+        combustache.render('{{#a}}{{/b}}{{/a}}', {})
+
+
+def test_deep_nesting():
+    depth = 2000
+    template = '{{#a}}' * depth + '{{/a}}' * depth
+    combustache.Template(template)
+
+    with pytest.raises(combustache.MissingClosingTagError):
+        combustache.Template(template[: -len('{{/a}}')])
+
+
+def test_unmatched_closing_tag_in_section():
+    with pytest.raises(
+        combustache.MissingClosingTagError, match='{{# a }} at 1:1'
+    ):
+        combustache.render('{{#a}}x{{/zz}}', {})
+
+    with pytest.raises(
+        combustache.MissingClosingTagError, match='{{# a }} at 1:1'
+    ):
+        combustache.render('{{#a}}{{= x =}}', {})
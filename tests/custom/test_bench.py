@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from combustache import Partials, Template, bench
+
+ARGS = ['--scale', '0.02', '--repeat', '1', '--min-time', '0']
+
+
+@pytest.mark.parametrize('name', list(bench.SCENARIOS))
+def test_scenarios_render(name: str):
+    source, data, partials = bench.SCENARIOS[name](0.1)
+    template = Template(source)
+
+    rendered = template.render(data, Partials(partials))
+    assert rendered
+    assert template.render(data, partials, compile=True) == rendered
+
+
+def test_json_and_compare(tmp_path: Path, capsys: pytest.CaptureFixture):
+    old = tmp_path / 'old.json'
+    new = tmp_path / 'new.json'
+    bench.cli([*ARGS, '-s', 'large_text', '-o', str(old)])
+    bench.cli(
+        [*ARGS, '-s', 'large_text', '-o', str(new), '--compare', str(old)]
+    )
+    capsys.readouterr()
+
+    report = json.loads(old.read_text())
+    assert [r['phase'] for r in report['results']] == [
+        'parse',
+        'render',
+        'compiled',
+    ]
+    assert report['results'][0]['size'] == len(bench.large_text(0.02)[0])
+
+    bench.cli(['--compare', str(old), str(new)])
+    out = capsys.readouterr().out
+    assert out.count('large_text') == 3
+    assert '%' in out
+
+
+def test_memory(capsys: pytest.CaptureFixture):
+    bench.cli(['--scale', '0.02', '--memory', '-s', 'wide_table'])
+    out = capsys.readouterr().out
+
+    assert 'bytes/tag' in out
+    assert 'wide_table' in out
@@ -0,0 +1,124 @@
+import pytest
+
+import combustache
+from combustache import LRUCache, main
+
+
+@pytest.fixture
+def cache():
+    old_size = combustache.template_cache.maxsize
+    combustache.template_cache.clear()
+    yield combustache.template_cache
+    combustache.template_cache.resize(old_size)
+    combustache.template_cache.clear()
+
+
+def test_render_reuses_parsed_template(cache: LRUCache):
+    template = 'Hello {{place}}!'
+
+    assert combustache.render(template, {'place': 'world'}) == 'Hello world!'
+    assert combustache.render(template, {'place': 'Mars'}) == 'Hello Mars!'
+
+    info = cache.info()
+    assert info.misses == 1
+    assert info.hits == 1
+    assert info.currsize == 1
+
+
+def test_cache_key_includes_delimiters(cache: LRUCache):
+    template = '{{a}}<%a%>'
+    data = {'a': 1}
+
+    assert combustache.render(template, data) == '1<%a%>'
+    assert combustache.render(template, data, None, '<%', '%>') == '{{a}}1'
+    assert cache.info().misses == 2
+
+
+def test_partials_are_cached(cache: LRUCache):
+    template = '{{#items}}{{>row}}{{/items}}'
+    data = {'items': [1, 2, 3]}
+    partials = {'row': '({{.}})'}
+
+    assert combustache.render(template, data, partials) == '(1)(2)(3)'
+    assert combustache.render(template, data, partials) == '(1)(2)(3)'
+    info = cache.info()
+    assert info.misses == 2
+    assert info.hits == 2
+
+
+def test_eviction(cache: LRUCache):
+    cache.resize(2)
+    for template in ['a', 'b', 'a', 'c']:
+        combustache.render(template, {})
+
+    info = cache.info()
+    assert info.evictions == 1
+    assert info.currsize == 2
+    assert ('a', '{{', '}}') in cache
+    assert ('b', '{{', '}}') not in cache
+
+
+def test_disabled_and_clear(cache: LRUCache):
+    cache.resize(0)
+    combustache.render('a', {})
+    combustache.render('a', {})
+    assert cache.info().currsize == 0
+    assert cache.info().misses == 2
+
+    cache.clear()
+    assert cache.info() == (0, 0, 0, 0, 0)
+
+
+def test_errors_are_not_cached(cache: LRUCache):
+    with pytest.raises(combustache.MissingClosingTagError):
+        combustache.render('{{#a}}', {})
+    assert cache.info().currsize == 0
+
+
+def test_negative_size():
+    with pytest.raises(ValueError):
+        LRUCache(-1)
+    with pytest.raises(ValueError):
+        LRUCache().resize(-1)
+
+
+@pytest.fixture
+def lambdas():
+    combustache.lambda_cache.clear()
+    yield combustache.lambda_cache
+    combustache.lambda_cache.clear()
+
+
+def test_lambda_templates_are_cached_apart(cache: LRUCache, lambdas: LRUCache):
+    template = '{{#items}}{{#wrap}}{{.}}{{/wrap}}{{greet}}{{/items}}'
+    data = {
+        'items': ['a', 'b'],
+        'wrap': lambda text: f'[{text}]',
+        'greet': lambda: '({{.}})',
+    }
+
+    assert combustache.render(template, data) == '[a](a)[b](b)'
+    assert cache.info().currsize == 1
+    info = lambdas.info()
+    assert info.misses == 2
+    assert info.hits == 2
+    assert ('({{.}})', '{{', '}}') in lambdas
+
+
+def test_repeated_lambda_templates_are_compiled(lambdas: LRUCache):
+    template = '{{#items}}{{greet}}{{/items}}'
+    data = {'items': ['a', 'b', 'c'], 'greet': lambda: '({{.}})'}
+
+    out = combustache.render(template, data, compile=True)
+    assert out == '(a)(b)(c)'
+    lambda_template = main._lambda_template('({{.}})', '{{', '}}')
+    assert lambda_template._renders == 3
+    assert lambda_template._compiled is not None
+
+
+def test_lambda_templates_rendered_once_are_not_compiled(lambdas: LRUCache):
+    data = {'greet': lambda: '({{x}})', 'x': 1}
+
+    assert combustache.render('{{greet}}', data, compile=True) == '(1)'
+    lambda_template = main._lambda_template('({{x}})', '{{', '}}')
+    assert lambda_template._compiled is None
@@ -2,6 +2,7 @@ import os
 import subprocess
 from pathlib import Path
 
+import pytest
 from conftest import EXPECTED, TEMPLATE
 
 from combustache.__main__ import cli
@@ -151,3 +152,114 @@ def test_stdout_output(clidir: Path):
     out = com.stdout.read().decode()
     (clidir / outpath).write_text(out)
     assert out == EXPECTED
+
+
+def test_cache_dir(clidir: Path):
+    outpath = 'output_cache_dir.txt'
+    os.chdir(clidir)
+
+    args = [
+        'template.txt',
+        '-d',
+        'data.json',
+        '--partial-dir',
+        'partials/',
+        '-p',
+        'cond.mustache',
+        '--left-delimiter',
+        '<%',
+        '--right-delimiter',
+        '%>',
+        '--cache-dir',
+        'cache/',
+        '-o',
+        outpath,
+    ]
+    cli(args)
+    assert (clidir / outpath).read_text() == EXPECTED
+    cached = sorted((clidir / 'cache').iterdir())
+    # the template and its three partials
+    assert len(cached) == 4
+
+    (clidir / outpath).unlink()
+    cli(args)
+    assert (clidir / outpath).read_text() == EXPECTED
+    assert sorted((clidir / 'cache').iterdir()) == cached
+
+
+def test_jsonl(tmp_path: Path):
+    os.chdir(tmp_path)
+    Path('records.jsonl').write_text('{"id": 1}\n\n{"id": 2}\n{"id": 3}\n')
+    Path('row.mustache').write_text('<{{id}}>')
+
+    for jobs in ('1', '2'):
+        cli(
+            [
+                '-s',
+                '{{>row}}',
+                '-p',
+                'row.mustache',
+                '-d',
+                'records.jsonl',
+                '--jsonl',
+                '--separator',
+                ',',
+                '--jobs',
+                jobs,
+                '-o',
+                'out.txt',
+            ]
+        )
+        assert Path('out.txt').read_text() == '<1>,<2>,<3>'
+
+
+def test_jsonl_output_pattern(tmp_path: Path):
+    os.chdir(tmp_path)
+    Path('records.jsonl').write_text('{"id": "a"}\n{"id": "b"}\n')
+
+    cli(
+        [
+            '-s',
+            '{{id}}',
+            '-d',
+            'records.jsonl',
+            '--batch',
+            '--output-pattern',
+            'out/{index}-{record[id]}.txt',
+        ]
+    )
+    assert Path('out/0-a.txt').read_text() == 'a'
+    assert Path('out/1-b.txt').read_text() == 'b'
+
+
+def test_jsonl_errors(tmp_path: Path):
+    os.chdir(tmp_path)
+    Path('records.jsonl').write_text('{}\n{\n')
+
+    with pytest.raises(ValueError, match='line 2'):
+        cli(['-s', '', '-d', 'records.jsonl', '--jsonl', '-o', 'out.txt'])
+    with pytest.raises(SystemExit):
+        cli(['-s', '', '-d', 'records.jsonl', '--jobs', '2'])
+
+
+def test_stream(clidir: Path):
+    outpath = 'output_stream.txt'
+    os.chdir(clidir)
+
+    cli(
+        [
+            '-s',
+            '{{firstName}}:{{#affirmatives}} {{>id}}{{name}}{{/affirmatives}}',
+            '-d',
+            'data.json',
+            '--partial-dir',
+            'partials/',
+            '--stream',
+            '-o',
+            outpath,
+        ]
+    )
+    out = (clidir / outpath).read_text()
+    assert out == (
+        'Sliver: (id70)First (id70)Second (id70)Third (id70)Always False'
+    )
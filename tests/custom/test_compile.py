@@ -0,0 +1,81 @@
+import combustache
+from combustache.compiler import generate_source
+
+
+def test_compiled_output_matches():
+    template = (
+        '{{#rows}}<tr>{{#cells}}<td>{{name}}</td>{{/cells}}'
+        '{{^cells}}<td>{{&empty}}</td>{{/cells}}</tr>\n{{/rows}}'
+        '{{>footer}}{{missing}}'
+    )
+    data = {
+        'rows': [
+            {'cells': [{'name': '<a>'}, {'name': 'b'}]},
+            {'cells': [], 'empty': '<none>'},
+        ],
+    }
+    partials = {'footer': '  {{#rows.0}}{{cells.1.name}}{{/rows.0}}'}
+
+    expected = combustache.render(template, data, partials)
+    out = combustache.render(template, data, partials, compile=True)
+    assert out == expected
+
+
+def test_compiled_lambdas():
+    calls = []
+
+    def counter():
+        calls.append(None)
+        return len(calls)
+
+    template = '{{lambda}} == {{{lambda}}} == {{lambda}} {{#wrap}}x{{/wrap}}'
+    data = {
+        'lambda': counter,
+        'wrap': lambda text: '<{{planet}}' + text + '>',
+        'planet': 'Earth',
+    }
+
+    out = combustache.render(template, data, compile=True)
+    assert out == '1 == 2 == 3 <Earthx>'
+
+
+def test_compiled_deep_nesting():
+    depth = 30
+    template = '{{#a}}{{b}}' * depth + '{{/a}}' * depth
+    data = {'a': [{'b': 1}], 'b': '.'}
+
+    expected = combustache.render(template, data)
+    assert combustache.render(template, data, compile=True) == expected
+
+
+def test_compile_is_cached():
+    template = combustache.Template('Hello {{place}}!')
+
+    assert template.compile() is template.compile()
+
+
+def test_generated_source_inlines_text():
+    template = combustache.Template('Hello {{place}}!{{#a}}x{{/a}}')
+
+    source, _ = generate_source(template._list)
+    # text starting a line is indented in standalone partials
+    assert "if indentation else 'Hello ')" in source
+    assert "append('!')" in source
+    assert "get_path(('place',))" in source
+    assert 'for i0 in v0:' in source
+
+
+def test_dynamic_templates_are_not_compiled():
+    counter = iter(range(1000))
+    template = '{{#rows}}{{lam}}{{#wrap}}x{{/wrap}}{{/rows}}'
+    data = {
+        'rows': [1, 2, 3],
+        'lam': lambda: f'{next(counter)}{{{{.}}}}',
+        'wrap': lambda text: f'<{text}{next(counter)}>',
+    }
+
+    out = combustache.render(template, data, compile=True)
+    assert out == '01<x1>22<x3>43<x5>'
+    for text in ['0{{.}}', '<x1>']:
+        assert combustache.get_template(text)._compiled is None
+    assert combustache.get_template(template)._compiled is not None
@@ -0,0 +1,44 @@
+from combustache.ctx import MISSING, Ctx, key_path
+
+
+def test_key_path():
+    assert key_path('.') == ()
+    assert key_path('a') == ('a',)
+    assert key_path('a.b.0') == ('a', 'b', '0')
+    assert key_path('a.b')[1] is key_path('b')[0]
+
+
+def test_get_path():
+    ctx = Ctx([{'a': {'b': [1, 2]}, 'c': 3}, {'c': 4}])
+
+    assert ctx.get_path(()) == {'c': 4}
+    assert ctx.get_path(('c',)) == 4
+    assert ctx.get_path(('a', 'b', '1')) == 2
+    assert ctx.get_path(('a', 'x')) is MISSING
+    assert ctx.get_path(('x', 'b')) is MISSING
+    assert ctx.get('a.b.0') == 1
+
+
+def test_deep_get():
+    class Obj:
+        a = 'attr'
+
+    class Indexable:
+        def __getitem__(self, key):
+            if key == 'a':
+                return 'item'
+            raise KeyError(key)
+
+    deep_get = Ctx.deep_get
+    assert deep_get({'a': 1}, 'a') == 1
+    assert deep_get({'a': 1}, 'b') is MISSING
+    assert deep_get({'a': 1}, 'keys') is MISSING
+    assert deep_get([1, 2, 3], '-1') == 3
+    assert deep_get([1, 2, 3], '3') is MISSING
+    assert deep_get('abc', '1') == 'b'
+    assert deep_get((1, 2), 'count') == (1, 2).count
+    assert deep_get(lambda: {'a': 1}, 'a') == 1
+    assert deep_get(Obj(), 'a') == 'attr'
+    assert deep_get(Obj(), '0') is MISSING
+    assert deep_get(Indexable(), 'a') == 'item'
+    assert deep_get(Indexable(), 'b') is MISSING
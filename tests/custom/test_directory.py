@@ -0,0 +1,100 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from combustache import MissingClosingTagError, TemplateDirectory
+from combustache.directory import find_dependencies
+from combustache.main import Template
+
+FILES = {
+    'layout': '<html>{{$body}}{{/body}}</html>',
+    'page': '{{<layout}}{{$body}}{{>header}}{{>*dyn}}{{/body}}{{/layout}}',
+    'header': '<h1>{{#title}}{{>title}}{{/title}}</h1>',
+    'title': '{{.}}',
+    'other': 'other',
+}
+
+
+def write(path: Path, name: str, text: str) -> None:
+    file = path / f'{name}.mustache'
+    file.write_text(text)
+    # make the change visible whatever the file system time resolution
+    stat = file.stat()
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+@pytest.fixture
+def templates(tmp_path: Path) -> TemplateDirectory:
+    for name, text in FILES.items():
+        write(tmp_path, name, text)
+    return TemplateDirectory(tmp_path, '.mustache')
+
+
+def test_find_dependencies():
+    template = Template(FILES['page'])
+
+    assert find_dependencies(template._list) == {'layout', 'header'}
+
+
+def test_graph(templates: TemplateDirectory):
+    assert templates.graph() == {
+        'layout': frozenset(),
+        'page': {'layout', 'header'},
+        'header': {'title'},
+        'title': frozenset(),
+        'other': frozenset(),
+    }
+    assert templates.dependencies('header') == {'title'}
+    assert templates.dependents('title') == {'header', 'page'}
+    assert templates.render('page', {'title': 'T'}) == (
+        '<html><h1>T</h1></html>'
+    )
+
+
+def test_refresh_reloads_only_changed(templates: TemplateDirectory):
+    page = templates.get_template('page')
+    header = templates.get_template('header')
+    assert templates.refresh() == set()
+
+    write(templates.path, 'title', '[{{.}}]')
+    assert templates.refresh() == {'title', 'header', 'page'}
+    assert templates.get_template('page') is page
+    assert templates.get_template('header') is header
+    assert templates.render('page', {'title': 'T'}) == (
+        '<html><h1>[T]</h1></html>'
+    )
+
+
+def test_refresh_new_and_deleted(templates: TemplateDirectory):
+    (templates.path / 'title.mustache').unlink()
+    assert templates.refresh() == {'title', 'header', 'page'}
+    assert 'title' not in templates
+    assert templates.render('page', {'title': 'T'}) == (
+        '<html><h1></h1></html>'
+    )
+
+    write(templates.path, 'dyn', 'new')
+    assert templates.refresh() == {'dyn'}
+    assert templates.render('page', {'dyn': 'dyn'}) == (
+        '<html><h1></h1>new</html>'
+    )
+
+
+def test_auto_reload(tmp_path: Path):
+    write(tmp_path, 'a', 'old')
+    templates = TemplateDirectory(tmp_path, '.mustache', auto_reload=0)
+
+    write(tmp_path, 'a', 'new')
+    assert templates.render('a', {}) == 'new'
+    with pytest.raises(KeyError):
+        templates.render('nope', {})
+
+
+def test_bad_template_kept(tmp_path: Path):
+    write(tmp_path, 'a', '{{#a}}')
+    templates = TemplateDirectory(tmp_path, '.mustache')
+
+    assert templates.dependencies('a') == frozenset()
+    with pytest.raises(MissingClosingTagError):
+        templates.render('a', {})
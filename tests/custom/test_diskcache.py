@@ -0,0 +1,127 @@
+import os
+import pickle
+from pathlib import Path
+
+import pytest
+
+import combustache
+from combustache import DiskCache, Partials, diskcache
+
+
+def test_loaded_in_new_process(tmp_path: Path, monkeypatch):
+    template = '{{#items}}<{{.}}>{{/items}}'
+    data = {'items': [1, 2]}
+    DiskCache(tmp_path).get_template(template)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    def fail(*args):
+        raise AssertionError('parsed again')
+
+    monkeypatch.setattr(combustache.main.Template, '__init__', fail)
+    monkeypatch.setattr(diskcache, 'compile_code', fail)
+    loaded = DiskCache(tmp_path).get_template(template)
+    assert loaded._compiled is not None
+    assert loaded.render(data, compile=True) == '<1><2>'
+    assert loaded.render(data) == '<1><2>'
+
+
+def test_keyed_by_source_and_delimiters(tmp_path: Path):
+    cache = DiskCache(tmp_path)
+    cache.get_template('{{a}}')
+    cache.get_template('{{a}}')
+    cache.get_template('{{b}}')
+    cache.get_template('{{a}}', '<%', '%>')
+
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+def test_corrupt_file_replaced(tmp_path: Path):
+    cache = DiskCache(tmp_path)
+    cache.get_template('{{a}}')
+    (path,) = tmp_path.iterdir()
+    path.write_bytes(b'garbage')
+
+    template = DiskCache(tmp_path).get_template('{{a}}')
+    assert template.render({'a': 1}) == '1'
+    assert path.read_bytes() != b'garbage'
+
+
+def test_truncated_file_replaced(tmp_path: Path):
+    DiskCache(tmp_path).get_template('{{a}}')
+    (path,) = tmp_path.iterdir()
+    path.write_bytes(path.read_bytes()[:-10])
+
+    template = DiskCache(tmp_path).get_template('{{a}}')
+    assert template.render({'a': 1}) == '1'
+
+
+def test_load_bug_raised(tmp_path: Path, monkeypatch):
+    DiskCache(tmp_path).get_template('{{a}}')
+
+    def fail(*args):
+        raise RuntimeError('bug')
+
+    monkeypatch.setattr(diskcache, 'load_function', fail)
+    with pytest.raises(RuntimeError, match='bug'):
+        DiskCache(tmp_path).get_template('{{a}}')
+
+
+def test_unwritable_directory(tmp_path: Path):
+    not_a_dir = tmp_path / 'file'
+    not_a_dir.write_text('')
+    cache = DiskCache(not_a_dir)
+
+    assert cache.get_template('{{a}}').render({'a': 1}) == '1'
+
+
+def test_clear(tmp_path: Path):
+    cache = DiskCache(tmp_path)
+    cache.get_template('{{a}}')
+    cache.clear()
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_prune(tmp_path: Path):
+    cache = DiskCache(tmp_path, max_size=None)
+    files = {}
+    for i, template in enumerate(['{{a}}', '{{b}}', '{{c}}']):
+        cache.get_template(template)
+        (files[template],) = set(tmp_path.iterdir()) - set(files.values())
+        os.utime(files[template], ns=(i, i))
+    size = max(path.stat().st_size for path in files.values())
+
+    # loading the oldest file marks it as the most recently used
+    DiskCache(tmp_path).get_template('{{a}}')
+    assert cache.prune(2 * size) == 1
+    assert set(tmp_path.iterdir()) == {files['{{a}}'], files['{{c}}']}
+    assert cache.prune(0) == 2
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_max_size(tmp_path: Path):
+    DiskCache(tmp_path).get_template('{{a}}')
+    (path,) = tmp_path.iterdir()
+    size = path.stat().st_size
+
+    cache = pickle.loads(pickle.dumps(DiskCache(tmp_path, 3 * size)))
+    for i in range(10):
+        cache.get_template(f'{{{{a{i}}}}}')
+        assert sum(p.stat().st_size for p in tmp_path.iterdir()) <= 3 * size
+    assert len(list(tmp_path.iterdir())) >= 2
+
+
+def test_load_templates_with_cache(tmp_path: Path):
+    (tmp_path / 'templates').mkdir()
+    (tmp_path / 'templates' / 'row.mustache').write_text('({{.}})\n')
+    (tmp_path / 'templates' / 'list.mustache').write_text(
+        '{{#items}}\n  {{>row}}\n{{/items}}\n'
+    )
+
+    partials = combustache.load_templates(
+        tmp_path / 'templates', '.mustache', cache_dir=tmp_path / 'cache'
+    )
+    assert isinstance(partials, Partials)
+    out = combustache.render('{{>list}}', {'items': [1, 2]}, partials)
+    assert out == '  (1)\n  (2)\n'
+    assert len(list((tmp_path / 'cache').iterdir())) == 2
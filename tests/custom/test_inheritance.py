@@ -0,0 +1,38 @@
+import combustache
+
+TEMPLATE = (
+    '{{#pages}}\n'
+    '  {{<layout}}\n'
+    '    {{$body}}\n'
+    '      <p>{{.}}</p>\n'
+    '    {{/body}}\n'
+    '  {{/layout}}\n'
+    '{{/pages}}'
+)
+
+
+def test_parents_and_blocks_are_parsed_once():
+    partials = combustache.Partials(
+        {'layout': '<main>\n  {{$body}}default{{/body}}\n</main>\n'}
+    )
+    template = combustache.Template(TEMPLATE)
+    data = {'pages': [1, 2]}
+    expected = (
+        '  <main>\n    <p>1</p>\n\n  </main>\n'
+        '  <main>\n    <p>2</p>\n\n  </main>\n'
+    )
+
+    assert template.render(data, partials) == expected
+    combustache.template_cache.clear()
+    assert template.render(data, partials) == expected
+    assert combustache.template_cache.info().misses == 0
+
+
+def test_changed_parent_source_is_reparsed():
+    sources = {'layout': '<main>{{$body}}{{/body}}</main>\n'}
+    partials = combustache.Partials(sources)
+    template = combustache.Template(TEMPLATE)
+
+    assert template.render({'pages': [1]}, partials).startswith('  <main>')
+    sources['layout'] = '<div>{{$body}}{{/body}}</div>\n'
+    assert template.render({'pages': [1]}, partials).startswith('  <div>')
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+import combustache
+
+TEMPLATE = '{{#rows}}({{.}}){{/rows}}{{^rows}}none{{/rows}}'
+
+
+class Array:
+    # numpy-style array with ambiguous truthiness
+    def __init__(self, *items):
+        self.items = items
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __bool__(self):
+        raise ValueError('truth value is ambiguous')
+
+
+def render(template, data, mode):
+    if mode == 'async':
+        template = combustache.Template(template)
+        return asyncio.run(template.render_async(data))
+    if mode == 'iter':
+        return ''.join(combustache.Template(template).render_iter(data))
+    return combustache.render(template, data, compile=mode == 'compiled')
+
+
+@pytest.fixture(params=['interpreted', 'compiled', 'iter', 'async'])
+def mode(request):
+    return request.param
+
+
+@pytest.mark.parametrize(
+    'rows',
+    [
+        (1, 2, 3),
+        range(1, 4),
+        {1: None, 2: None, 3: None}.keys(),
+        Array(1, 2, 3),
+    ],
+)
+def test_collections(rows, mode):
+    assert render(TEMPLATE, {'rows': rows}, mode) == '(1)(2)(3)'
+
+
+@pytest.mark.parametrize('rows', [(), range(0), Array()])
+def test_empty_collections(rows, mode):
+    assert render(TEMPLATE, {'rows': rows}, mode) == 'none'
+
+
+def test_generators(mode):
+    data = {'rows': (i for i in range(1, 4)), 'empty': iter([])}
+    template = TEMPLATE + '{{#empty}}x{{/empty}}{{^empty}}empty{{/empty}}'
+
+    assert render(template, data, mode) == '(1)(2)(3)empty'
+
+
+def test_generators_are_lazy():
+    consumed = []
+
+    def rows():
+        for i in range(3):
+            consumed.append(i)
+            yield i
+
+    template = '{{#rows}}{{.}}{{/rows}}'
+    chunks = combustache.Template(template).render_iter({'rows': rows()})
+    assert next(chunks) == '0'
+    assert consumed == [0]
+
+
+def test_strings_and_mappings_are_not_iterated(mode):
+    data = {'s': 'abc', 'b': b'ab', 'm': {'k': 'v'}}
+    template = '{{#s}}[{{.}}]{{/s}}{{#b}}[{{{.}}}]{{/b}}{{#m}}[{{k}}]{{/m}}'
+
+    assert render(template, data, mode) == "[abc][b'ab'][v]"
+
+
+def test_callable_results_are_iterated(mode):
+    def rows(text):
+        return iter([1, 2])
+
+    assert render('{{#rows}}{{.}}{{/rows}}', {'rows': rows}, mode) == '12'
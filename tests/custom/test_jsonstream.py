@@ -0,0 +1,90 @@
+import io
+import json
+
+import pytest
+
+import combustache
+from combustache.jsonstream import JsonArray, JsonObject, stream_json
+
+DOCUMENT = {
+    'title': 'Export',
+    'rows': [{'id': i, 'price': i * 1.25e-3} for i in range(20)],
+    'meta': {'count': 20, 'tags': ['a', 'b']},
+    'end': None,
+}
+
+
+class CountingReader(io.StringIO):
+    def __init__(self, text: str) -> None:
+        super().__init__(text)
+        self.chars = 0
+
+    def read(self, size: int = -1, /) -> str:
+        chunk = super().read(size)
+        self.chars += len(chunk)
+        return chunk
+
+
+def materialize(value):
+    if isinstance(value, JsonObject):
+        return {key: materialize(value[key]) for key in list(value)}
+    if isinstance(value, JsonArray):
+        return [materialize(item) for item in value]
+    return value
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 1 << 16])
+def test_decodes_like_json(chunk_size):
+    text = json.dumps(DOCUMENT, indent=2)
+    data = stream_json(io.StringIO(text), chunk_size)
+
+    assert materialize(data) == DOCUMENT
+
+
+def test_reads_only_as_far_as_used():
+    text = json.dumps(DOCUMENT)
+    fp = CountingReader(text)
+    data = stream_json(fp, 8)
+
+    assert data['title'] == 'Export'
+    assert fp.chars < 40
+    rows = data['rows']
+    assert next(rows) == {'id': 0, 'price': 0.0}
+    assert fp.chars < 80
+
+
+def test_array_read_past_is_kept():
+    data = stream_json(io.StringIO(json.dumps(DOCUMENT)), 8)
+    rows = data['rows']
+    assert next(rows)['id'] == 0
+
+    assert data['end'] is None
+    assert [row['id'] for row in rows] == list(range(1, 20))
+    assert list(rows) == []
+
+
+def test_render_streams_sections():
+    template = combustache.Template(
+        '{{title}}:{{#rows}} {{id}}{{/rows}} {{meta.count}}'
+    )
+    data = stream_json(io.StringIO(json.dumps(DOCUMENT)), 16)
+    out = io.StringIO()
+
+    template.render_to(data, out)
+    assert out.getvalue() == template.render(DOCUMENT)
+
+
+def test_top_level_array():
+    data = stream_json(io.StringIO('[1, [2], {"a": 3}]'))
+
+    assert combustache.render('{{#.}}<{{&.}}>{{/.}}', data) == (
+        "<1><[2]><{'a': 3}>"
+    )
+
+
+def test_bad_json():
+    data = stream_json(io.StringIO('{"a": 1 "b": 2}'))
+
+    assert data['a'] == 1
+    with pytest.raises(json.JSONDecodeError):
+        data['b']
@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import pytest
+
+import combustache
+from combustache import Partials, TemplateLoader
+
+
+@pytest.fixture
+def templates(tmp_path: Path) -> Path:
+    (tmp_path / 'ui').mkdir()
+    (tmp_path / 'ui' / 'comment.mustache').write_text('<p>{{text}}</p>')
+    (tmp_path / 'index.mustache').write_text(
+        '{{#comments}}{{>comment}}{{/comments}}'
+    )
+    (tmp_path / 'other.file').write_text('')
+    return tmp_path
+
+
+def test_reads_on_first_access(templates: Path, monkeypatch):
+    loader = TemplateLoader(templates, '.mustache')
+    assert sorted(loader) == ['comment', 'index']
+    assert len(loader) == 2
+    assert 'comment' in loader
+    assert 'other' not in loader
+
+    reads = []
+    read_text = Path.read_text
+
+    def counting_read_text(self, *args, **kwargs):
+        reads.append(self.name)
+        return read_text(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, 'read_text', counting_read_text)
+    data = {'comments': [{'text': 'a'}, {'text': 'b'}]}
+    out = combustache.render('{{>index}}', data, Partials(loader))
+    assert out == '<p>a</p><p>b</p>'
+    assert loader['index'] is loader['index']
+    assert reads == ['index.mustache', 'comment.mustache']
+
+
+def test_relative_path(templates: Path):
+    loader = TemplateLoader(templates, '.mustache', include_relative_path=True)
+
+    assert sorted(loader) == ['index', 'ui.comment']
+    assert dict(loader) == combustache.load_templates(
+        templates, '.mustache', include_relative_path=True
+    )
+
+
+def test_deleted_file(templates: Path):
+    loader = TemplateLoader(templates, '.mustache')
+    (templates / 'index.mustache').unlink()
+
+    assert loader.get('index') is None
+    with pytest.raises(KeyError):
+        loader['nope']
@@ -1,4 +1,9 @@
+import pytest
+
 import combustache
+from combustache import main
+from combustache.nodes import Node, Section
+from combustache.util import LineIndex
 
 
 def test_multiline_partial_tag_in_partial():
@@ -12,3 +17,67 @@ def test_multiline_partial_tag_in_partial():
 
     out = combustache.render(template, data, partials)
     assert out == expected
+
+
+def test_line_index():
+    template = 'a\n  {{x}}  \n\n{{y}} b'
+    lines = LineIndex(template)
+
+    assert lines.line(4) == (2, 12, 4, 9)
+    assert lines.line(9) == (2, 12, 4, 9)
+    assert lines.line(12) == (12, 13, 13, 12)
+    assert lines.line(len(template)) == (13, 20, 13, 20)
+    assert lines.line(0) == (0, 2, 0, 1)
+
+
+def test_standalone_tags_on_a_long_line():
+    template = (
+        '  {{#a}}' + '{{b}} ' * 10000 + '{{/a}}\n  {{#a}}  \n{{b}}{{/a}}'
+    )
+    data = {'a': True, 'b': 'x'}
+
+    out = combustache.render(template, data)
+    assert out == '  ' + 'x ' * 10000 + '\nx'
+
+
+@pytest.mark.parametrize(
+    'left, right',
+    [('{{', '}}'), ('.*', '+?'), ('(', ')'), ('=', '='), ('|', '|')],
+)
+def test_tag_pattern_delimiters(left: str, right: str):
+    template = (
+        f'{left}! c {right}{left}#s{right}{left}{{v}}{right}{left}/s{right}'
+        f'{left}^n{right}[{left}&v{right}]{left}/n{right}{left}='
+    )
+    data = {'s': True, 'v': '<'}
+
+    assert (
+        combustache.render(
+            template, data, left_delimiter=left, right_delimiter=right
+        )
+        == f'<[<]{left}='
+    )
+    assert main.tag_pattern(left, right) is main.tag_pattern(left, right)
+
+
+def test_unclosed_type_tag_ends_parsing():
+    # {{=}} is not closed by the =}} of the next tag
+    template = 'a{{=}}b{{=x y=}}c'
+
+    assert combustache.render(template, {}) == template
+
+
+def test_nodes_are_compact():
+    template = main.Template(
+        '{{a}}{{&b}}{{{c}}}{{#s}}{{^i}}{{/i}}{{/s}}{{>*p}}'
+        '{{<q}}{{$b}}x{{/b}}{{/q}}{{!c}}{{=<% %>=}}<%a%>'
+    )
+    nodes = list(template._list)
+    for node in nodes:
+        if isinstance(node, Section):
+            nodes += [node.closing_tag, *node.inside._list]
+    nodes = [node for node in nodes if isinstance(node, Node)]
+
+    assert not any(hasattr(node, '__dict__') for node in nodes)
+    first, second = [node for node in nodes if node.contents == 'a']
+    assert first.path is second.path
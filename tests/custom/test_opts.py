@@ -1,6 +1,9 @@
+import html
+
 import pytest
 
 import combustache
+from combustache.util import escape_html, escape_value, to_str
 
 
 def test_stringify():
@@ -31,6 +34,53 @@ def test_escape():
     assert out == expected
 
 
+class Markup:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def __html__(self) -> str:
+        return self.text
+
+
+@pytest.mark.parametrize('compile', [False, True])
+def test_safe_strings_are_not_escaped(compile: bool):
+    template = '{{a}} {{b}} {{c}} {{&c}} {{n}}'
+    data = {
+        'a': '<b> & "q"',
+        'b': combustache.SafeString('<i>'),
+        'c': Markup('<u>'),
+        'n': 1.5,
+    }
+    expected = '&lt;b&gt; &amp; &quot;q&quot; <i> <u> <u> 1.5'
+
+    assert combustache.render(template, data, compile=compile) == expected
+
+
+@pytest.mark.parametrize(
+    'value',
+    [None, True, 3, 2.5, 'a < b', "'q'", Markup('<u>'), ['<li>'], {'&': 1}],
+)
+def test_escape_value(value):
+    assert escape_value(value) == escape_html(to_str(value))
+
+
+@pytest.mark.parametrize('string', ['', 'plain', '<a href="x">&\'</a>'])
+def test_escape_html_matches_html_escape(string: str):
+    assert escape_html(string) == html.escape(string)
+
+
+def test_cached_escape_html():
+    escape = combustache.cached_escape_html(maxsize=2, max_length=4)
+    template = '{{#items}}{{.}}|{{/items}}'
+    data = {
+        'items': ['<a>', '<a>', 'long <string>', combustache.SafeString('<a>')]
+    }
+    expected = '&lt;a&gt;|&lt;a&gt;|long &lt;string&gt;|<a>|'
+
+    assert combustache.render(template, data, escape=escape) == expected
+    assert escape.args[0] == {'<a>': '&lt;a&gt;'}
+
+
 def test_missing_data():
     template = 'Location: {{location}}.'
     data = {}
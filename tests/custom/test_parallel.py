@@ -0,0 +1,70 @@
+import pickle
+
+import pytest
+
+import combustache
+
+TEMPLATE = '{{>row}}{{#tags}}[{{.}}]{{/tags}}'
+PARTIALS = {'row': '{{id}}: {{name}} '}
+RECORDS = [
+    {'id': i, 'name': f'<{i}>', 'tags': ['a'] * (i % 3)} for i in range(50)
+]
+
+
+def expected():
+    return [combustache.render(TEMPLATE, r, PARTIALS) for r in RECORDS]
+
+
+@pytest.mark.parametrize('executor', ['process', 'thread'])
+@pytest.mark.parametrize('compile', [False, True])
+def test_ordered(executor, compile):
+    results = combustache.render_many(
+        TEMPLATE,
+        RECORDS,
+        PARTIALS,
+        workers=2,
+        executor=executor,
+        chunksize=4,
+        compile=compile,
+    )
+    assert list(results) == expected()
+
+
+@pytest.mark.parametrize('executor', ['process', 'thread'])
+def test_unordered(executor):
+    results = combustache.render_many(
+        combustache.Template(TEMPLATE),
+        iter(RECORDS),
+        PARTIALS,
+        workers=3,
+        executor=executor,
+        chunksize=3,
+        ordered=False,
+    )
+    assert sorted(results) == sorted(expected())
+
+
+def test_stops_early():
+    results = combustache.render_many(
+        '{{.}}', range(10**6), workers=2, executor='thread', chunksize=10
+    )
+    assert next(results) == '0'
+    results.close()
+
+
+def test_bad_arguments():
+    with pytest.raises(ValueError):
+        combustache.render_many('', [], executor='fiber')  # type: ignore
+    with pytest.raises(ValueError):
+        combustache.render_many('', [], chunksize=0)
+    with pytest.raises(ValueError):
+        combustache.render_many('', [], workers=0)
+
+
+def test_compiled_template_pickles():
+    template = combustache.Template(TEMPLATE)
+    data = RECORDS[4]
+    rendered = template.render(data, PARTIALS, compile=True)
+
+    copy = pickle.loads(pickle.dumps(template))
+    assert copy.render(data, PARTIALS, compile=True) == rendered
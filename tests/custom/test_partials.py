@@ -0,0 +1,91 @@
+import combustache
+from combustache import Partials
+
+
+def test_partials_mapping():
+    partials = Partials({'row': '({{.}})'})
+
+    assert partials['row'] == '({{.}})'
+    assert list(partials) == ['row']
+    assert len(partials) == 1
+    assert partials.get('nope') is None
+
+
+def test_partial_parsed_once():
+    template = '{{#items}}{{>row}}{{/items}}'
+    data = {'items': [1, 2, 3]}
+    partials = Partials({'row': '({{.}})'})
+
+    assert combustache.render(template, data, partials) == '(1)(2)(3)'
+    row = partials.get_template('row')
+    assert combustache.render(template, data, partials) == '(1)(2)(3)'
+    assert partials.get_template('row') is row
+
+
+def test_partial_parsed_once_for_all_indentations():
+    template = '  {{>row}}\n\t{{>row}}\n  {{>row}}\n'
+    partials = Partials({'row': 'a\nb\n'})
+
+    out = combustache.render(template, {}, partials)
+    assert out == '  a\n  b\n\ta\n\tb\n  a\n  b\n'
+    assert list(partials._templates) == [('row', '', False)]
+
+
+def test_nested_standalone_partials():
+    template = '  {{>outer}}\n'
+    partials = Partials({'outer': '<\n  {{>inner}}\n>\n', 'inner': 'a\nb\n'})
+
+    for compile in (False, True):
+        out = combustache.render(template, {}, partials, compile=compile)
+        assert out == '  <\n    a\n    b\n  >\n'
+        assert (
+            ''.join(combustache.Template(template).render_iter({}, partials))
+            == out
+        )
+
+
+def test_indented_partial_lambda():
+    template = '  {{>row}}\n'
+    partials = {'row': '{{#wrap}}\nx\n{{/wrap}}\n'}
+    data = {'wrap': lambda text: f'[{text}]'}
+
+    out = combustache.render(template, data, partials)
+    assert out == '[  x\n]'
+
+
+def test_indented_partial_with_inheritance():
+    template = '  {{>page}}\n'
+    partials = {
+        'page': '{{<layout}}{{$body}}b\n{{/body}}{{/layout}}\n',
+        'layout': '<\n{{$body}}{{/body}}>',
+    }
+
+    out = combustache.render(template, {}, partials)
+    assert out == '  <\nb\n>'
+
+
+def test_missing_partial():
+    partials = Partials()
+
+    assert partials.get_template('nope') is None
+    out = combustache.render(
+        '{{>nope}}', {}, partials, missing_data=lambda: '?'
+    )
+    assert out == '?'
+
+
+def test_template_render_with_partials():
+    template = combustache.Template('{{>name}}!')
+    partials = Partials({'name': '{{name}}'})
+
+    assert template.render({'name': 'Anahit'}, partials) == 'Anahit!'
+
+
+def test_changed_source_is_reparsed():
+    sources = {'x': 'a'}
+    partials = Partials(sources)
+
+    assert combustache.render('{{>x}}', {}, partials) == 'a'
+    sources['x'] = 'b'
+    assert partials['x'] == 'b'
+    assert combustache.render('{{>x}}', {}, partials) == 'b'
@@ -0,0 +1,67 @@
+import io
+import threading
+
+import combustache
+from combustache import Profiler, Template, main
+
+TEMPLATE = '{{#items}}\n  {{>row}}\n{{/items}}\n{{title}}'
+PARTIALS = {'row': '<{{name}}>\n'}
+DATA = {'items': [{'name': 1}, {'name': 2}], 'title': 'T'}
+
+
+def test_records_nodes():
+    combustache.template_cache.clear()
+    profiler = Profiler()
+    result = combustache.render(
+        TEMPLATE, DATA, PARTIALS, profile=profiler, compile=True
+    )
+    assert result == '  <1>\n  <2>\nT'
+
+    assert profiler.stats['render'].calls == 1
+    assert profiler.stats['{{# items }} 1:1'].calls == 1
+    assert profiler.stats['{{> row }} 2:3'].calls == 2
+    assert profiler.stats['{{ name }} 1:2'].calls == 2
+    assert profiler.stats['{{ title }} 4:1'].calls == 1
+    assert profiler.render_time > 0
+    assert 'parse' in profiler.stats
+
+    report = profiler.report(sort='own', limit=3)
+    assert report.startswith('parse: ')
+    assert len(report.splitlines()) == 5
+
+
+def test_collapsed_stacks():
+    profiler = Profiler()
+    with profiler:
+        Template(TEMPLATE).render(DATA, PARTIALS)
+
+    out = io.StringIO()
+    profiler.dump_collapsed(out)
+    stacks = [line.rsplit(' ', 1)[0] for line in out.getvalue().splitlines()]
+    assert 'render;{{# items }} 1:1;{{> row }} 2:3;{{ name }} 1:2' in stacks
+    assert all(
+        line.rsplit(' ', 1)[1].isdigit()
+        for line in out.getvalue().splitlines()
+    )
+
+
+def test_hooks_are_removed():
+    interpret = Template._interpret
+    with Profiler():
+        with Profiler() as inner:
+            assert Template._interpret is not interpret
+        assert Template._interpret is not interpret
+    assert Template._interpret is interpret
+    assert main.parse.__module__ == 'combustache.main'
+    assert inner.stats == {}
+
+
+def test_other_threads_are_not_recorded():
+    profiler = Profiler()
+    with profiler:
+        thread = threading.Thread(
+            target=combustache.render, args=(TEMPLATE, DATA, PARTIALS)
+        )
+        thread.start()
+        thread.join()
+    assert profiler.stats == {}
@@ -0,0 +1,101 @@
+import io
+import json
+import threading
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from combustache import ServerError, TemplateDirectory
+from combustache.__main__ import cli
+from combustache.server import RenderServer, request, serve_lines
+
+
+@pytest.fixture
+def templates(tmp_path: Path) -> TemplateDirectory:
+    root = tmp_path / 'templates'
+    root.mkdir()
+    (root / 'page.mustache').write_text('<b>{{>name}}</b>')
+    (root / 'name.mustache').write_text('{{name}}')
+    (root / 'bad.mustache').write_text('{{#open}}')
+    return TemplateDirectory(root, '.mustache')
+
+
+@pytest.fixture
+def server(
+    tmp_path: Path, templates: TemplateDirectory
+) -> Iterator[RenderServer]:
+    with RenderServer(tmp_path / 'render.sock', templates) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        yield server
+        server.shutdown()
+        thread.join()
+
+
+def test_serve_lines(templates: TemplateDirectory):
+    lines = [
+        json.dumps({'template': 'page', 'data': {'name': 'a & b'}}),
+        '\n',
+        json.dumps({'template': 'page'}),
+        json.dumps({'template': 'nope'}),
+        json.dumps({'template': 'bad'}),
+        'not json',
+    ]
+    output = io.StringIO()
+    serve_lines(templates, lines, output)
+
+    responses = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert responses[:3] == [
+        {'output': '<b>a &amp; b</b>'},
+        {'output': '<b></b>'},
+        {'error': "KeyError: 'nope'"},
+    ]
+    assert responses[3]['error'].startswith('MissingClosingTagError')
+    assert responses[4]['error'].startswith('JSONDecodeError')
+
+
+def test_request(server: RenderServer):
+    path = server.server_address
+
+    assert request(path, 'page', {'name': 'x'}, timeout=5) == '<b>x</b>'
+    assert request(path, 'name', {'name': 'y'}, timeout=5) == 'y'
+    with pytest.raises(ServerError, match='nope'):
+        request(path, 'nope', {}, timeout=5)
+
+
+def test_stale_socket(tmp_path: Path, templates: TemplateDirectory):
+    path = tmp_path / 'render.sock'
+    with RenderServer(path, templates):
+        with pytest.raises(OSError, match='already listening'):
+            RenderServer(path, templates)
+    assert not path.exists()
+
+    path.touch()
+    with RenderServer(path, templates) as server:
+        assert server.server_address == str(path)
+
+
+def test_client_cli(server: RenderServer, tmp_path: Path):
+    data = tmp_path / 'data.json'
+    data.write_text('{"name": "z"}')
+    out = tmp_path / 'out.txt'
+
+    cli(
+        [
+            'client',
+            'page',
+            '--socket',
+            str(server.server_address),
+            '-d',
+            str(data),
+            '-o',
+            str(out),
+        ]
+    )
+    assert out.read_text() == '<b>z</b>'
+
+    socket = str(server.server_address)
+    with pytest.raises(SystemExit) as e:
+        cli(['client', 'nope', '--socket', socket, '-d', str(data)])
+    assert e.value.code == 1
@@ -0,0 +1,42 @@
+import io
+
+import combustache
+
+TEMPLATE = (
+    '{{#items}}{{>row}}{{/items}}'
+    '{{<layout}}{{$body}}[{{title}}]{{/body}}{{/layout}}'
+)
+DATA = {'items': [1, 2, 3], 'title': '<t>'}
+PARTIALS = {'row': '({{.}})\n', 'layout': '<{{$body}}{{/body}}>'}
+
+
+def test_render_iter_matches_render():
+    template = combustache.Template(TEMPLATE)
+
+    chunks = list(template.render_iter(DATA, PARTIALS))
+    assert len(chunks) > 1
+    assert ''.join(chunks) == template.render(DATA, PARTIALS)
+
+
+def test_render_iter_is_lazy():
+    calls = []
+
+    def late():
+        calls.append(None)
+        return 'late'
+
+    template = combustache.Template('early {{late}}')
+    chunks = template.render_iter({'late': late})
+
+    assert next(chunks) == 'early '
+    assert calls == []
+    assert next(chunks) == 'late'
+    assert calls == [None]
+
+
+def test_render_to():
+    template = combustache.Template(TEMPLATE)
+    fp = io.StringIO()
+
+    template.render_to(DATA, fp, PARTIALS)
+    assert fp.getvalue() == template.render(DATA, PARTIALS)